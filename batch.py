@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import concurrent.futures
+import glob
+import os
+import os.path
+import sys
+import time
+from my_parser import MyParser
+from my_parser import StackParser
+from my_cache import CompileCache
+from my_optimizer import Optimizer
+from my_output import OutputWriter
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: batch.py
+# --------------------------------
+
+# compile cache of this (worker) process, see compile_file()
+compile_cache = None
+
+# compiles one file and writes its stack code next to it (file.txt -> file.out)
+# cache_dir: reuse / store the code of unchanged files in a CompileCache
+# returns (path, error message or None, number of instructions, bytes read,
+# True if the code came from the cache). a file that cannot be compiled for
+# any other reason (not utf-8, too deeply nested for -backtrack, ...) is a
+# failure of its own instead of stopping the whole run
+def compile_file(path, backtrack=False, optimize=False, recover=False, cache_dir=None):
+    try:
+        return compile_text_file(path, backtrack, optimize, recover, cache_dir)
+    except Exception as error:
+        return path, '%s: %s' % (type(error).__name__, error), 0, 0, False
+
+# compiles one file (see compile_file())
+def compile_text_file(path, backtrack=False, optimize=False, recover=False, cache_dir=None):
+    global compile_cache
+    with open (path, 'r') as open_file:
+        lines = open_file.readlines()
+    num_bytes = sum(len(line) for line in lines)
+
+    if (backtrack):
+        parser = MyParser(False, False)
+    else:
+        parser = StackParser(False, False)
+
+    cached = False
+    if (cache_dir != None):
+        if (compile_cache == None or compile_cache.directory != cache_dir):
+            compile_cache = CompileCache(cache_dir)
+        hits = compile_cache.hits
+        output = compile_cache.compile(lines, parser, optimize, False, recover)
+        cached = compile_cache.hits > hits
+    else:
+        output = parser.parse(lines, report_errors=False, recover=recover)
+        if (output != None and optimize):
+            output = Optimizer().optimize(output)
+
+    if (output == None):
+        errors = parser.determine_errors()
+        if (recover):
+            return path, '\n'.join(str(error) for error in errors), 0, num_bytes, False
+        return path, str(errors[0]), 0, num_bytes, False
+
+    writer = OutputWriter(os.path.splitext(path)[0] + '.out')
+    writer.write(output)
+    writer.close()
+    num_instrs = len(output)
+    output.close()
+    return path, None, num_instrs, num_bytes, cached
+
+# expands the file names / glob patterns given on the command line
+def find_files(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if (len(matches) == 0):
+            print ('ImportError: could not find file', pattern)
+        files.extend(matches)
+    return files
+
+if __name__ == '__main__':
+    # command line arguments
+    if ('-help' in sys.argv or len(sys.argv) < 2):
+        print ('\tThis program compiles many text files into hypothetical\n\
+        stack machine code in parallel. The code for file.txt is\n\
+        written to file.out next to it.\n\n\
+        usage: batch.py [options] files/globs...\n\n\
+        [Command Argument Commands]\n\
+        -help\t: prints out help for the program\n\
+        -j N\t: number of worker processes (default: number of cores)\n\
+        -backtrack\t: uses the backtracking parser instead of -stack\n\
+        -O\t: optimizes the generated code\n\
+        -recover\t: reports every error in a file instead of the first\n\
+        -cache DIR\t: reuses the code of unchanged files from DIR\n')
+        sys.exit()
+
+    workers = os.cpu_count()
+    backtrack = False
+    optimize = False
+    recover = False
+    cache_dir = None
+    patterns = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if (arg == '-j'):
+            workers = int(next(args))
+        elif (arg == '-backtrack'):
+            backtrack = True
+        elif (arg == '-O'):
+            optimize = True
+        elif (arg == '-recover'):
+            recover = True
+        elif (arg == '-cache'):
+            cache_dir = next(args)
+        else:
+            patterns.append(arg)
+
+    files = find_files(patterns)
+    if (len(files) == 0):
+        sys.exit(1)
+
+    # compile files across a pool of worker processes
+    start_time = time.perf_counter()
+    succeeded = 0
+    failed = 0
+    total_bytes = 0
+    total_instrs = 0
+    cache_hits = 0
+    chunk_size = max(1, len(files) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(compile_file, files, [backtrack] * len(files), [optimize] * len(files), [recover] * len(files), [cache_dir] * len(files), chunksize=chunk_size)
+        for path, error, num_instrs, num_bytes, cached in results:
+            total_bytes += num_bytes
+            if (error == None):
+                succeeded += 1
+                total_instrs += num_instrs
+                if (cached):
+                    cache_hits += 1
+            else:
+                failed += 1
+                print ('Failed to compile %s:\n%s' % (path, error))
+    total_time = time.perf_counter() - start_time
+
+    print ('Compiled %i files (%i succeeded, %i failed) with %i workers in %f s' % (len(files), succeeded, failed, workers, total_time))
+    print ('%.1f files/s, %.0f bytes/s, %i instructions written' % (len(files) / total_time, total_bytes / total_time, total_instrs))
+    if (cache_dir != None):
+        print ('%i of %i compiled files were cached in %s' % (cache_hits, succeeded, cache_dir))
+
+    if (failed > 0):
+        sys.exit(1)
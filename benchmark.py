@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import contextlib
+import math
+import os
+import sys
+import time
+import tracemalloc
+from my_parser import MyParser
+from my_parser import PredictiveParser
+from my_parser import StackParser
+from my_parser import TableParser
+from my_native import compile_program
+from my_optimizer import Optimizer
+from my_output import OutputWriter
+from my_vm import StackMachine
+from my_vm import decode
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: benchmark.py
+# --------------------------------
+
+# statement used to build benchmark programs: every statement makes
+# factor, primary, term' and expr' fail (and roll back) several times
+bench_stmt = 'BETA := ALPHA + 2 * GAMMA div (C3P0 - R2D2);\n'
+
+# program sizes (in statements) to benchmark
+bench_sizes = [250, 500, 1000, 2000, 4000, 8000]
+
+# initial variables needed to run bench_stmt
+bench_env = {'ALPHA': 7, 'GAMMA': 11, 'C3P0': 9, 'R2D2': 2}
+
+# a parse that takes longer than this (in seconds) ends a size sweep
+time_budget = 5.0
+
+# exponent (time vs size) above which scaling is reported as super-linear
+super_linear = 1.3
+
+# builds a program with the given number of statements
+def make_program(num_stmts):
+    lines = ['begin\n']
+    lines.extend([bench_stmt] * num_stmts)
+    lines.append('end\n')
+    return lines
+
+# --------------------------------
+#   PROGRAM GENERATORS
+# --------------------------------
+
+# long statement list: A := ...; repeated
+def gen_statements(size):
+    return make_program(size)
+
+# deeply nested parentheses: A := ((((A))))
+def gen_nested(size):
+    return ['begin\n', 'A := %sA%s\n' % ('(' * size, ')' * size), 'end\n']
+
+# long right associative power chain: A := X ^ X ^ ... ^ X
+def gen_pow_chain(size):
+    return ['begin\n', 'A := %s\n' % ' ^ '.join(['X'] * size), 'end\n']
+
+# wide expression mixing + - * div mod: A := X0 + X1 * X2 div X3 ...
+def gen_wide(size):
+    ops = [' + ', ' * ', ' div ', ' - ', ' mod ']
+    words = ['X0']
+    for i in range(1, size):
+        words.append(ops[i % len(ops)])
+        words.append('X%i' % i)
+    return ['begin\n', 'A := %s\n' % ''.join(words), 'end\n']
+
+# 100 statements using identifiers that are 'size' characters long
+def gen_long_ids(size):
+    name = 'A' * (size - 1)
+    lines = ['begin\n']
+    for i in range(100):
+        lines.append('%s%i := %sB + %sC * 2;\n' % (name, i % 10, name, name))
+    lines.append('end\n')
+    return lines
+
+# name -> (generator, sizes to sweep)
+shapes = {
+    'statements': (gen_statements, [250, 500, 1000, 2000, 4000, 8000]),
+    'nested': (gen_nested, [4, 8, 16, 32, 64, 128, 256, 512]),
+    'pow': (gen_pow_chain, [100, 200, 400, 800, 1600, 3200]),
+    'wide': (gen_wide, [250, 500, 1000, 2000, 4000, 8000]),
+    'ids': (gen_long_ids, [64, 128, 256, 512, 1024, 2048, 4096]),
+}
+
+# times how long the backtracking parser takes on the given program
+def time_parse(lines):
+    parser = MyParser(False, False)
+    # hide any debug printing done while parsing
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start_time = time.perf_counter()
+            output = parser.parse(lines)
+            total_time = time.perf_counter() - start_time
+    return total_time, len(output)
+
+# parses programs of increasing length: per statement cost should stay flat
+def bench_rollback():
+    print ('%10s %12s %12s %16s' % ('stmts', 'outputs', 'time (s)', 'per stmt (us)'))
+    for num_stmts in bench_sizes:
+        total_time, num_outputs = time_parse(make_program(num_stmts))
+        print ('%10i %12i %12.4f %16.2f' % (num_stmts, num_outputs, total_time, total_time / num_stmts * 1e6))
+
+# parses the program once for time and once (traced) for peak memory
+# returns (time in seconds, peak bytes allocated, number of instructions)
+def measure_parse(parser_class, lines):
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start_time = time.perf_counter()
+            output = parser_class(False, False).parse(lines)
+            total_time = time.perf_counter() - start_time
+
+            tracemalloc.start()
+            parser_class(False, False).parse(lines)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return total_time, peak, len(output)
+
+# sweeps every program shape over increasing sizes with both parsers and
+# reports time, peak memory and the time vs size scaling exponent
+def bench_shapes(names=None):
+    for shape in (names or shapes):
+        generator, sizes = shapes[shape]
+        for parser_class in (MyParser, PredictiveParser, StackParser, TableParser):
+            print ('\n%s / %s' % (shape, parser_class.__name__))
+            print ('%8s %10s %10s %12s %12s %10s' % ('size', 'bytes', 'instrs', 'time (s)', 'peak (KB)', 'exponent'))
+            last = None
+            for size in sizes:
+                # skip sizes that would take far longer than the budget
+                if (last != None and last[2] > 0):
+                    last_size, last_time, exponent = last
+                    if (last_time * (size / last_size) ** max(exponent, 1.0) > time_budget * 4):
+                        print ('%8i %10s (skipped: estimated over time budget)' % (size, ''))
+                        break
+
+                lines = generator(size)
+                total_time, peak, num_instrs = measure_parse(parser_class, lines)
+                exponent = 0.0
+                if (last != None and last[1] > 0):
+                    exponent = math.log(total_time / last[1]) / math.log(size / last[0])
+                flag = ''
+                if (exponent > super_linear):
+                    flag = '  SUPER-LINEAR'
+                print ('%8i %10i %10i %12.4f %12.1f %10.2f%s' % (size, sum(len(line) for line in lines), num_instrs, total_time, peak / 1024, exponent, flag))
+                last = (size, total_time, exponent)
+                if (total_time > time_budget):
+                    break
+
+# runs programs of increasing length on the stack machine
+def bench_vm():
+    print ('%10s %12s %12s %16s' % ('stmts', 'instrs', 'time (s)', 'instrs/s'))
+    for num_stmts in bench_sizes:
+        output = StackParser(False, False).parse(make_program(num_stmts))
+        program = decode(output)
+        machine = StackMachine(bench_env)
+        start_time = time.perf_counter()
+        machine.execute(program)
+        total_time = time.perf_counter() - start_time
+        print ('%10i %12i %12.4f %16.0f' % (num_stmts, machine.executed, total_time, machine.executed / total_time))
+
+# statements sharing subexpressions across statements (ALPHA changes every
+# third statement, which kills the values that read it)
+cse_stmts = [
+    'BETA := (C3P0 - R2D2) * GAMMA + ALPHA * GAMMA;\n',
+    'DELTA := ALPHA * GAMMA - (C3P0 - R2D2) div 2;\n',
+    'ALPHA := ALPHA + (C3P0 - R2D2);\n',
+]
+
+# builds a program of the given number of cse_stmts
+def make_cse_program(num_stmts):
+    lines = ['begin\n']
+    for i in range(num_stmts):
+        lines.append(cse_stmts[i % len(cse_stmts)])
+    lines.append('end\n')
+    return lines
+
+# runs cse_stmts programs optimized without and with common subexpression
+# elimination on the stack machine
+def bench_cse():
+    print ('%10s %12s %12s %12s %12s %10s' % ('stmts', 'instrs', 'cse instrs', 'time (s)', 'cse time (s)', 'speedup'))
+    for num_stmts in bench_sizes:
+        output = StackParser(False, False).parse(make_cse_program(num_stmts))
+        times = []
+        executed = []
+        for cse in (False, True):
+            program = decode(Optimizer(cse).optimize(output))
+            machine = StackMachine(bench_env)
+            start_time = time.perf_counter()
+            machine.execute(program)
+            times.append(time.perf_counter() - start_time)
+            executed.append(machine.executed)
+        print ('%10i %12i %12i %12.4f %12.4f %10.2f' % (num_stmts, executed[0], executed[1], times[0], times[1], times[0] / times[1]))
+
+# runs each program many times (with different inputs) on the stack
+# machine and through its compiled python function
+def bench_native():
+    print ('%10s %8s %14s %14s %14s %10s' % ('stmts', 'runs', 'vm (runs/s)', 'compile (s)', 'native (runs/s)', 'speedup'))
+    for num_stmts in bench_sizes[:4]:
+        output = StackParser(False, False).parse(make_program(num_stmts))
+        program = decode(output)
+        runs = max(1, 20000 // num_stmts)
+
+        start_time = time.perf_counter()
+        for run in range(runs):
+            StackMachine(dict(bench_env, ALPHA=run)).execute(program)
+        vm_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        native = compile_program(output)
+        compile_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        for run in range(runs):
+            native.run(StackMachine(dict(bench_env, ALPHA=run)))
+        native_time = time.perf_counter() - start_time
+        print ('%10i %8i %14.1f %14.4f %14.1f %10.1f' % (num_stmts, runs, runs / vm_time, compile_time, runs / native_time, vm_time / native_time))
+
+# small programs compiled by one warm parser (see MyParser.parse_many())
+bench_small = 'begin\n  A := 1 + B * 2;\n  C := A ^ 2 - (B div 3)\nend\n'
+small_counts = [1000, 10000, 50000]
+
+# compiles many small programs with one parser per class, once with a new
+# parser and parse() per program and once with a single parse_many()
+def bench_many():
+    print ('%-18s %10s %14s %14s %12s' % ('parser', 'programs', 'new (prog/s)', 'many (prog/s)', 'instrs'))
+    for parser_class in (PredictiveParser, StackParser, TableParser):
+        for count in small_counts:
+            lines = bench_small.splitlines(True)
+            start_time = time.perf_counter()
+            for i in range(count):
+                parser_class(False, False).parse(lines)
+            new_time = time.perf_counter() - start_time
+
+            parser = parser_class(False, False)
+            start_time = time.perf_counter()
+            instructions = 0
+            for result in parser.parse_many([bench_small] * count):
+                instructions += result.instructions
+            many_time = time.perf_counter() - start_time
+            print ('%-18s %10i %14.0f %14.0f %12i' % (parser_class.__name__, count, count / new_time, count / many_time, instructions))
+
+# parses cse_stmts programs and reports their symbol tables: the strings
+# of the symbols (shared through the table) against one string per
+# reference, as the parsers kept before interning
+def bench_symbols():
+    print ('%10s %10s %12s %14s %14s' % ('stmts', 'symbols', 'references', 'shared (KiB)', 'copies (KiB)'))
+    for num_stmts in bench_sizes:
+        parser = StackParser(False, False)
+        parser.parse(make_cse_program(num_stmts))
+        symbols = parser.symbols
+        references = 0
+        shared = 0
+        copies = 0
+        for index, name in enumerate(symbols):
+            count = symbols.uses[index] + len(symbols.definition_sites(name))
+            references += count
+            shared += sys.getsizeof(name)
+            copies += sys.getsizeof(name) * count
+        print ('%10i %10i %12i %14.1f %14.1f' % (num_stmts, len(symbols), references, shared / 1024, copies / 1024))
+
+# statements of the programs whose listings bench_output() writes
+output_sizes = [8000, 32000, 64000]
+
+# writes listings to os.devnull, once with one print() per instruction (as
+# start.py used to) and once with an OutputWriter, as text and binary
+def bench_output():
+    print ('%10s %10s %14s %14s %14s' % ('stmts', 'instrs', 'print (MB/s)', 'text (MB/s)', 'binary (MB/s)'))
+    for num_stmts in output_sizes:
+        output = StackParser(False, False).parse(make_program(num_stmts))
+        num_bytes = sum(len(chunk) for chunk in output.text_chunks())
+
+        start_time = time.perf_counter()
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            for node in output:
+                print (node)
+        print_time = time.perf_counter() - start_time
+
+        times = []
+        for binary in (False, True):
+            start_time = time.perf_counter()
+            writer = OutputWriter(os.devnull, binary)
+            writer.write(output)
+            writer.close()
+            times.append(time.perf_counter() - start_time)
+        megabytes = num_bytes / 1e6
+        print ('%10i %10i %14.1f %14.1f %14.1f' % (num_stmts, len(output), megabytes / print_time, megabytes / times[0], megabytes / times[1]))
+
+benchmarks = {
+    'rollback': bench_rollback,
+    'vm': bench_vm,
+    'native': bench_native,
+    'cse': bench_cse,
+    'many': bench_many,
+    'output': bench_output,
+    'symbols': bench_symbols,
+    'shapes': bench_shapes,
+}
+
+if __name__ == '__main__':
+    # the parsers recurse once per statement / nesting level
+    sys.setrecursionlimit(100000)
+
+    # run the benchmarks (or single shapes) named on the command line
+    # (default: all benchmarks)
+    names = sys.argv[1:]
+    if (len(names) == 0):
+        names = list(benchmarks)
+    for name in names:
+        print ('[%s]' % name)
+        if (name in shapes):
+            bench_shapes([name])
+        else:
+            benchmarks[name]()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import asyncio
+import json
+import sys
+import time
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: client.py
+# --------------------------------
+
+# opens a connection to a compile server (see server.py)
+async def connect(path=None, port=4340):
+    if (path != None):
+        return await asyncio.open_unix_connection(path, limit=1 << 24)
+    return await asyncio.open_connection('127.0.0.1', port, limit=1 << 24)
+
+# sends every request over one connection without waiting for responses
+# and returns the responses in the order of the requests
+async def send_requests(requests, path=None, port=4340):
+    reader, writer = await connect(path, port)
+
+    async def send():
+        for index, request in enumerate(requests):
+            request['id'] = index
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    responses = [None] * len(requests)
+    remaining = len(requests)
+    while (remaining > 0):
+        response = json.loads(await reader.readline())
+        # the server answers a line it could not read with id null
+        if (response.get('id') == None):
+            continue
+        responses[response['id']] = response
+        remaining -= 1
+    await sender
+    writer.close()
+    return responses
+
+# compiles many programs (source texts) and returns one response each
+def compile_many(sources, path=None, port=4340, backtrack=False, optimize=False, recover=False):
+    requests = [{'source': source, 'backtrack': backtrack, 'optimize': optimize, 'recover': recover} for source in sources]
+    return asyncio.run(send_requests(requests, path, port))
+
+# compiles one program and returns its response
+def compile_source(source, path=None, port=4340, backtrack=False, optimize=False, recover=False):
+    return compile_many([source], path, port, backtrack, optimize, recover)[0]
+
+# returns the server's request counts and latencies
+def server_stats(path=None, port=4340):
+    return asyncio.run(send_requests([{'stats': True}], path, port))[0]['stats']
+
+if __name__ == '__main__':
+    # command line arguments
+    if ('-help' in sys.argv or len(sys.argv) < 2):
+        print ('\tThis program sends text files to a running compile server\n\
+        (see server.py) and prints the generated stack machine code.\n\n\
+        usage: client.py [options] files...\n\n\
+        [Command Argument Commands]\n\
+        -help\t: prints out help for the program\n\
+        -unix PATH\t: connects to a unix socket\n\
+        -port N\t: connects to localhost tcp port N (default: 4340)\n\
+        -backtrack\t: uses the backtracking parser\n\
+        -O\t: optimizes the generated code\n\
+        -recover\t: reports every error in a file instead of the first\n\
+        -quiet\t: only prints the summary\n\
+        -stats\t: prints the server\'s request counts and latencies\n')
+        sys.exit()
+
+    path = None
+    port = 4340
+    options = {'backtrack': False, 'optimize': False, 'recover': False}
+    quiet = False
+    stats = False
+    files = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if (arg == '-unix'):
+            path = next(args)
+        elif (arg == '-port'):
+            port = int(next(args))
+        elif (arg == '-backtrack'):
+            options['backtrack'] = True
+        elif (arg == '-O'):
+            options['optimize'] = True
+        elif (arg == '-recover'):
+            options['recover'] = True
+        elif (arg == '-quiet'):
+            quiet = True
+        elif (arg == '-stats'):
+            stats = True
+        else:
+            files.append(arg)
+
+    sources = []
+    for file_name in files:
+        with open (file_name, 'r') as open_file:
+            sources.append(open_file.read())
+
+    start_time = time.perf_counter()
+    responses = compile_many(sources, path, port, **options)
+    total_time = time.perf_counter() - start_time
+
+    failed = 0
+    for file_name, response in zip(files, responses):
+        if (not response['ok']):
+            failed += 1
+        if (quiet):
+            continue
+        print ('%s (%.3f ms):' % (file_name, response['latency_ms']))
+        if (response['ok']):
+            print ('\n'.join(response['instructions']))
+        else:
+            print ('\n'.join(response['errors']))
+
+    if (len(files) > 0):
+        print ('Compiled %i files (%i failed) in %f s (%.1f files/s)' % (len(files), failed, total_time, len(files) / total_time))
+    if (stats):
+        print (json.dumps(server_stats(path, port), indent=2))
+    if (failed > 0):
+        sys.exit(1)
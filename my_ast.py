@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_ast.py
+# --------------------------------
+
+# abstract syntax tree built by the parsers (see MyParser.parse_ast()).
+# nodes only hold what code generation and analyses need, and use
+# __slots__ so a tree costs a few small objects per token.
+#
+# the tree has the shape of the code the parser has always generated:
+#   - a ^ b ^ c              -> BinOp(POW, a, BinOp(POW, b, c))
+#   - a * b div c            -> BinOp(DIV, BinOp(MPY, a, b), c)
+#   - a - b + c (expr' is right recursive, so + and - group to the right)
+#                            -> BinOp(SUB, a, BinOp(ADD, b, c))
+
+# base class of every node
+class Node():
+    __slots__ = ()
+
+# begin stmt_list end
+class Program(Node):
+    __slots__ = ('stmts',)
+
+    def __init__(self, stmts):
+        self.stmts = stmts
+
+    def __repr__(self):
+        return 'Program(%r)' % self.stmts
+
+# id := expr ('pos' is the text position of the id)
+class Assign(Node):
+    __slots__ = ('target', 'expr', 'pos')
+
+    def __init__(self, target, expr, pos):
+        self.target = target
+        self.expr = expr
+        self.pos = pos
+
+    def __repr__(self):
+        return 'Assign(%r, %r)' % (self.target, self.expr)
+
+# left op right (op is the Opcode that computes it)
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return 'BinOp(%s, %r, %r)' % (self.op.name, self.left, self.right)
+
+# an id used as a value
+class Var(Node):
+    __slots__ = ('name', 'pos')
+
+    def __init__(self, name, pos):
+        self.name = name
+        self.pos = pos
+
+    def __repr__(self):
+        return 'Var(%r)' % self.name
+
+# a number (kept as written, like the PUSH operand)
+class Num(Node):
+    __slots__ = ('value', 'pos')
+
+    def __init__(self, value, pos):
+        self.value = value
+        self.pos = pos
+
+    def __repr__(self):
+        return 'Num(%s)' % self.value
+
+# yields every node of a tree, parents before children and left before
+# right (without recursion, so long ^ chains are fine)
+def walk(node):
+    stack = [node]
+    while (len(stack) > 0):
+        node = stack.pop()
+        yield node
+        if (isinstance(node, BinOp)):
+            stack.append(node.right)
+            stack.append(node.left)
+        elif (isinstance(node, Assign)):
+            stack.append(node.expr)
+        elif (isinstance(node, Program)):
+            stack.extend(reversed(node.stmts))
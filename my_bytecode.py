@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import array
+import enum
+import itertools
+import mmap
+import struct
+import sys
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_bytecode.py
+# --------------------------------
+
+# stack machine instructions
+class Opcode(enum.IntEnum):
+    LVALUE = 1
+    RVALUE = 2
+    PUSH = 3
+    ADD = 4
+    SUB = 5
+    MPY = 6
+    DIV = 7
+    MOD = 8
+    POW = 9
+    STO = 10
+    HALT = 11
+
+# instructions that take an operand from the symbol table
+operand_opcodes = (Opcode.LVALUE, Opcode.RVALUE, Opcode.PUSH)
+
+# bytes.translate() table giving 1 for the opcodes with an operand and 0
+# for every other opcode
+operand_mask = bytes(1 if (opcode in operand_opcodes) else 0 for opcode in range(256))
+
+# listing text of every opcode: opcodes with an operand are followed by a
+# tab and the operand, the others end their line
+listing_prefixes = [''] * (max(Opcode) + 1)
+for opcode in Opcode:
+    if (opcode in operand_opcodes):
+        listing_prefixes[opcode] = opcode.name + '\t'
+    else:
+        listing_prefixes[opcode] = opcode.name + '\n'
+
+# instructions rendered at a time by Bytecode.text_chunks()
+chunk_lines = 65536
+
+# binary file format (all values little-endian):
+#   header   -> magic 'SMBC', version (u16), reserved (u16),
+#               instruction count (u32), symbol count (u32)
+#   opcodes  -> one u8 per instruction, padded to a multiple of 4 bytes
+#   operands -> one u32 symbol index per instruction
+#   symbols  -> for each symbol: byte length (u32) + utf-8 bytes
+file_magic = b'SMBC'
+file_version = 1
+file_header = struct.Struct('<4sHHII')
+
+# compact stack machine code: an opcode array plus an operand array
+# holding indexes into an interned table of ids and numbers
+class Bytecode():
+    def __init__(self):
+        self.opcodes = array.array('B')
+        self.operands = array.array('I')
+        self.symbols = []
+        self.symbol_ids = {}
+        self.file_map = None
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    # renders every instruction as a line of the text listing
+    def __iter__(self):
+        for index in range(len(self.opcodes)):
+            yield self.render(index)
+
+    # returns the index of the given id / number, adding it if new
+    def intern(self, symbol):
+        index = self.symbol_ids.get(symbol)
+        if (index == None):
+            index = len(self.symbols)
+            self.symbols.append(symbol)
+            self.symbol_ids[symbol] = index
+        return index
+
+    # appends an instruction and returns its index
+    def add(self, opcode, symbol=None):
+        index = len(self.opcodes)
+        self.opcodes.append(opcode)
+        if (symbol == None):
+            self.operands.append(0)
+        else:
+            self.operands.append(self.intern(symbol))
+        return index
+
+    # replaces instructions start:end with every instruction of another
+    # bytecode (start == end == len(self) appends)
+    def splice(self, start, end, code):
+        self.opcodes[start:end] = code.opcodes
+        if (len(code.symbols) == 0):
+            self.operands[start:end] = array.array('I', bytes(4 * len(code)))
+            return
+        # map the other symbol table onto this one
+        mapping = [self.intern(symbol) for symbol in code.symbols]
+        self.operands[start:end] = array.array('I', [mapping[operand] for operand in code.operands])
+
+    # drops the symbols that no instruction uses (splice() only ever adds
+    # symbols) and renumbers the operands
+    def compact(self):
+        mask = self.opcodes.tobytes().translate(operand_mask)
+        used = sorted(set(itertools.compress(self.operands, mask)))
+        # the operand of an instruction without one becomes 0
+        renumber = [0] * len(self.symbols)
+        for index, operand in enumerate(used):
+            renumber[operand] = index
+        self.operands = array.array('I', map(renumber.__getitem__, self.operands))
+        self.symbols = [self.symbols[operand] for operand in used]
+        self.symbol_ids = {symbol: index for index, symbol in enumerate(self.symbols)}
+
+    # returns the operand text of the instruction at index
+    def symbol(self, index):
+        return self.symbols[self.operands[index]]
+
+    # removes every instruction after the first length ones
+    def truncate(self, length):
+        del self.opcodes[length:]
+        del self.operands[length:]
+
+    # formats the instruction at index the same way as the text listing
+    def render(self, index):
+        opcode = Opcode(self.opcodes[index])
+        if (opcode in operand_opcodes):
+            return '%s\t%s' % (opcode.name, self.symbols[self.operands[index]])
+        return opcode.name
+
+    # yields the text listing (the lines of __iter__, each ending in '\n')
+    # one chunk of instructions at a time, rendered with table lookups
+    # instead of formatting every instruction on its own
+    def text_chunks(self, lines=chunk_lines):
+        symbol_lines = [symbol + '\n' for symbol in self.symbols]
+        # operand text by opcode (the operand of an instruction without one
+        # can still be any symbol index, e.g. after splice())
+        no_operand = [''] * max(1, len(symbol_lines))
+        suffixes = []
+        for opcode in range(len(listing_prefixes)):
+            if (opcode in operand_opcodes):
+                suffixes.append(symbol_lines)
+            else:
+                suffixes.append(no_operand)
+        for start in range(0, len(self.opcodes), lines):
+            opcodes = self.opcodes[start:start + lines]
+            operands = self.operands[start:start + lines]
+            yield ''.join([listing_prefixes[opcode] + suffixes[opcode][operand] for opcode, operand in zip(opcodes, operands)])
+
+    # writes the code to an open binary file
+    def write(self, file):
+        encoded = [symbol.encode('utf-8') for symbol in self.symbols]
+        file.write(file_header.pack(file_magic, file_version, 0, len(self.opcodes), len(encoded)))
+        file.write(self.opcodes.tobytes())
+        file.write(bytes(-len(self.opcodes) % 4))
+        operands = array.array('I', self.operands)
+        if (sys.byteorder != 'little'):
+            operands.byteswap()
+        file.write(operands.tobytes())
+        for symbol in encoded:
+            file.write(struct.pack('<I', len(symbol)))
+            file.write(symbol)
+
+    # writes the code to the given file path
+    def save(self, path):
+        with open(path, 'wb') as open_file:
+            self.write(open_file)
+
+    # memory-maps code written by save() back from the given file path.
+    # raises ValueError if the file is not a complete bytecode file
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as open_file:
+            file_map = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # every size is checked before any view of the map is taken (the
+        # map cannot be closed while a view exists)
+        size = len(file_map)
+        if (size < file_header.size):
+            file_map.close()
+            raise ValueError('%s is not a version %i bytecode file' % (path, file_version))
+        magic, version, reserved, num_instrs, num_symbols = file_header.unpack_from(file_map, 0)
+        if (magic != file_magic or version != file_version):
+            file_map.close()
+            raise ValueError('%s is not a version %i bytecode file' % (path, file_version))
+
+        opcodes_pos = file_header.size
+        operands_pos = opcodes_pos + num_instrs + (-num_instrs % 4)
+        pos = operands_pos + num_instrs * 4
+        names = []
+        try:
+            for i in range(num_symbols):
+                if (pos + 4 > size):
+                    raise ValueError('short symbol table')
+                length = struct.unpack_from('<I', file_map, pos)[0]
+                pos += 4
+                if (pos + length > size):
+                    raise ValueError('short symbol table')
+                names.append(str(file_map[pos:pos + length], 'utf-8'))
+                pos += length
+            if (pos != size):
+                raise ValueError('wrong size')
+        except ValueError:
+            file_map.close()
+            raise ValueError('%s is truncated or corrupt' % path)
+
+        code = cls()
+        code.file_map = file_map
+        view = memoryview(file_map)
+        code.opcodes = view[opcodes_pos:opcodes_pos + num_instrs]
+        if (sys.byteorder == 'little'):
+            code.operands = view[operands_pos:operands_pos + num_instrs * 4].cast('I')
+        else:
+            code.operands = array.array('I')
+            code.operands.frombytes(view[operands_pos:operands_pos + num_instrs * 4])
+            code.operands.byteswap()
+        for name in names:
+            code.intern(name)
+        return code
+
+    # releases the memory map of code returned by load()
+    def close(self):
+        if (self.file_map != None):
+            self.opcodes.release()
+            if (isinstance(self.operands, memoryview)):
+                self.operands.release()
+            self.opcodes = array.array('B')
+            self.operands = array.array('I')
+            self.file_map.close()
+            self.file_map = None
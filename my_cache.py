@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import hashlib
+import os
+import os.path
+import struct
+from my_bytecode import Bytecode
+from my_optimizer import Optimizer
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_cache.py
+# --------------------------------
+
+# bump when the parsers / optimizer start generating different code for the
+# same source, so old cache entries are never used
+compiler_version = 2
+
+# default cache directory and size
+default_cache_dir = '.smcache'
+default_max_bytes = 64 * 1024 * 1024
+
+# extension of cache entries (bytecode files, see Bytecode.save())
+entry_ext = '.smbc'
+
+# on-disk cache of compiled programs keyed by a hash of the source text and
+# everything else that changes the generated code. entries are bytecode
+# files; a hit memory-maps the file instead of parsing. the least recently
+# used entries are removed once the cache grows past max_bytes.
+class CompileCache():
+    def __init__(self, directory=default_cache_dir, max_bytes=default_max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # bytes used by entries (counted on the first store)
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # returns the cache key of a source text compiled with the given options
+    def key(self, text, *options):
+        digest = hashlib.sha256()
+        digest.update(('%i %s\n' % (compiler_version, ' '.join(str(option) for option in options))).encode('utf-8'))
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + entry_ext)
+
+    # returns the cached bytecode for key, or None. a truncated or corrupt
+    # entry counts as a miss and is removed, so it is compiled again
+    def get(self, key):
+        path = self.path(key)
+        try:
+            code = Bytecode.load(path)
+            # the modification time orders entries for eviction
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        except (ValueError, struct.error):
+            self.misses += 1
+            self.remove(path)
+            return None
+        self.hits += 1
+        return code
+
+    # stores bytecode under key
+    def put(self, key, code):
+        if (self.size == None):
+            self.size = sum(size for mtime, size, path in self.entries())
+
+        # write to a temporary file first so readers never see half a file
+        path = self.path(key)
+        temp_path = '%s.%i.tmp' % (path, os.getpid())
+        code.save(temp_path)
+        os.replace(temp_path, path)
+        self.stores += 1
+        self.size += os.path.getsize(path)
+        if (self.size > self.max_bytes):
+            self.evict()
+
+    # returns (modification time, size, path) of every entry
+    def entries(self):
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if (entry.name.endswith(entry_ext)):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    # removes the least recently used entries until the cache is at most
+    # three quarters full (so the next few stores do not evict again)
+    def evict(self):
+        entries = sorted(self.entries())
+        self.size = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if (self.size <= self.max_bytes * 3 // 4):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+            self.evictions += 1
+
+    # removes the entry at path (if it is still there)
+    def remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if (self.size != None):
+            self.size -= size
+
+    # removes every entry
+    def clear(self):
+        for mtime, size, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.size = 0
+
+    # compiles lines with the given parser (optimizing the code if asked)
+    # unless the same text was already compiled the same way. errors are
+    # not cached: a program with errors is parsed (and reported) every time
+    def compile(self, lines, parser, optimize=False, report_errors=True, recover=False):
+        key = self.key(''.join(lines), type(parser).__name__, optimize)
+        output = self.get(key)
+        if (output != None):
+            return output
+
+        output = parser.parse(lines, report_errors, recover)
+        if (output == None):
+            return None
+        if (optimize):
+            output = Optimizer().optimize(output)
+        self.put(key, output)
+        return output
+
+    def to_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'bytes': self.size,
+        }
+
+    # returns the hit / miss counters as one line of text
+    def report(self):
+        lookups = self.hits + self.misses
+        rate = 0.0
+        if (lookups > 0):
+            rate = self.hits / lookups * 100
+        return 'Cache: %i hits, %i misses (%.1f%% hit rate), %i stored, %i evicted' % (self.hits, self.misses, rate, self.stores, self.evictions)
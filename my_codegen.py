@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# coding=utf-8
+from my_ast import BinOp
+from my_ast import Num
+from my_ast import Var
+from my_bytecode import Bytecode
+from my_bytecode import Opcode
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_codegen.py
+# --------------------------------
+
+# generates stack machine code for a whole program:
+#   LVALUE id, <expr>, STO for every assignment, then HALT
+def generate(program, output=None):
+    if (output == None):
+        output = Bytecode()
+    for stmt in program.stmts:
+        generate_stmt(stmt, output)
+    output.add(Opcode.HALT)
+    return output
+
+# generates the code of one assignment
+def generate_stmt(stmt, output):
+    output.add(Opcode.LVALUE, stmt.target)
+    generate_expr(stmt.expr, output)
+    output.add(Opcode.STO)
+
+# generates the postfix code of an expression in one walk over the tree
+# (operators wait on the stack until both operands have been generated)
+def generate_expr(expr, output):
+    stack = [expr]
+    while (len(stack) > 0):
+        node = stack.pop()
+        if (isinstance(node, BinOp)):
+            stack.append(node.op)
+            stack.append(node.right)
+            stack.append(node.left)
+        elif (isinstance(node, Var)):
+            output.add(Opcode.RVALUE, node.name)
+        elif (isinstance(node, Num)):
+            output.add(Opcode.PUSH, node.value)
+        else:
+            output.add(node)
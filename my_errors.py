@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import bisect
+import enum
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_errors.py
+# --------------------------------
+
+class ParseErrorType(enum.Enum):
+    INVALID_CHAR = 1
+    INVALID_ID = 2
+    EXPECTED_KEYWORD = 3
+    EXPECTED_NUM = 4
+
+# line start offsets of a text, built once per parse and shared by every
+# ParseError so a position can be turned into a line and column quickly.
+# 'start' and 'first_line' give the position and line number of the first
+# line when the lines are only part of a file.
+class LineIndex():
+    def __init__(self, lines, start=0, first_line=1):
+        # an empty text still has one (empty) line
+        if (len(lines) == 0):
+            lines = ['']
+        self.lines = lines
+        self.first_line = first_line
+        self.starts = []
+        for line in lines:
+            self.starts.append(start)
+            start += len(line)
+
+    # returns the (line number, position in line) of a text position,
+    # both starting at 1
+    def locate(self, pos):
+        line_index = bisect.bisect_right(self.starts, pos) - 1
+        line_index = min(max(line_index, 0), len(self.lines) - 1)
+        return line_index + self.first_line, pos - self.starts[line_index] + 1
+
+    # returns the text of the given line number (starting at 1)
+    def line(self, line_num):
+        return self.lines[line_num - self.first_line]
+
+# line lookup for a text that is never split into lines (lines end at
+# '\n'): the line of a position is only found when an error is formatted.
+# positions give the same line and column as LineIndex(text.splitlines(True))
+class TextLineIndex():
+    def __init__(self, text):
+        self.text = text
+        self.line_start = 0
+
+    # returns the (line number, position in line) of a text position,
+    # both starting at 1
+    def locate(self, pos):
+        start = self.text.rfind('\n', 0, min(max(pos, 0), len(self.text))) + 1
+        # the end of a text ending in '\n' is still on its last line
+        if (start == len(self.text) and start > 0):
+            start = self.text.rfind('\n', 0, start - 1) + 1
+        self.line_start = start
+        return self.text.count('\n', 0, start) + 1, pos - start + 1
+
+    # returns the text of the line found by the last call to locate()
+    def line(self, line_num):
+        end = self.text.find('\n', self.line_start)
+        if (end == -1):
+            end = len(self.text)
+        return self.text[self.line_start:end + 1]
+
+# line lookup for a memory-mapped file that is never split into lines:
+# newlines are only counted when an error is actually formatted
+class MappedLineIndex():
+    def __init__(self, data, block_size=1 << 20):
+        self.data = data
+        self.block_size = block_size
+        self.line_start = 0
+
+    # returns the (line number, position in line) of a file position,
+    # both starting at 1
+    def locate(self, pos):
+        pos = min(max(pos, 0), len(self.data))
+        count = 0
+        for start in range(0, pos, self.block_size):
+            count += self.data[start:min(start + self.block_size, pos)].count(b'\n')
+        self.line_start = self.data.rfind(b'\n', 0, pos) + 1
+        # the end of a file ending in '\n' is still on its last line (the
+        # same as TextLineIndex)
+        if (self.line_start == len(self.data) and self.line_start > 0):
+            self.line_start = self.data.rfind(b'\n', 0, self.line_start - 1) + 1
+            count -= 1
+        return count + 1, pos - self.line_start + 1
+
+    # returns the text of the line found by the last call to locate()
+    def line(self, line_num):
+        end = self.data.find(b'\n', self.line_start)
+        if (end == -1):
+            end = len(self.data)
+        return str(self.data[self.line_start:end + 1], 'latin-1')
+
+    # returns a LineIndex holding just the line of the given position, so
+    # errors can still be formatted after the file is closed
+    def detach(self, pos):
+        line_num, pos_num = self.locate(pos)
+        return LineIndex([self.line(line_num)], self.line_start, line_num)
+
+# the errors of failed alternatives that are worth showing: only errors at
+# the furthest position reached are kept (the first one of each type), so
+# the set stays bounded no matter how often the parser backtracks
+class ErrorSet():
+    def __init__(self):
+        self.errors = []
+        self.max_pos = 0
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def add(self, error):
+        if (error.pos > self.max_pos):
+            self.max_pos = error.pos
+            self.errors = [error]
+        elif (error.pos == self.max_pos):
+            for found in self.errors:
+                if (found.error_type == error.error_type):
+                    return
+            self.errors.append(error)
+
+    def clear(self):
+        self.errors = []
+        self.max_pos = 0
+
+# accepts text position and formats an error message for the parser
+class ParseError(Exception):
+    def __init__(self, pos, line_index, msg, error_type):
+        self.pos = pos
+        self.line_index = line_index
+        self.msg = msg
+        self.error_type = error_type
+        
+    def __str__(self):
+        line_num, pos_num = self.line_index.locate(self.pos)
+        line = self.line_index.line(line_num)
+        if (not line.endswith('\n')):
+            line += '\n'
+
+        return 'ParseError[%s]: %s at line %s pos %s:\n%s%s^\n' % (self.error_type.name, self.msg, line_num, pos_num, line, ' ' * (pos_num - 1))
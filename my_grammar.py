@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import array
+import sys
+from my_bytecode import Opcode
+from my_lexer import TokenType
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_grammar.py
+# --------------------------------
+
+# The grammar of my_parser.py written as data, and the generator that turns
+# it into the LL(1) parse table used by TableParser. changing the language
+# (a new operator, a new statement) means editing the spec below: FIRST /
+# FOLLOW sets and the table are recomputed on import, and a grammar that is
+# not LL(1) is rejected with the conflicting rules.
+#
+# every rule is a list of alternatives, every alternative a list of:
+#   TokenType  a terminal, matched against the next token
+#   'name'     a nonterminal (another rule)
+#   '@name'    an action, run when the parser gets to it (see TableParser)
+# an empty alternative is ϵ.
+#
+# the actions build the tree on a value stack:
+#   @target  pushes the index of the id just matched
+#   @var     pushes Var() of the id just matched
+#   @num     pushes Num() of the number just matched
+#   @assign  replaces target, expr with Assign()
+#   @program replaces every statement with Program()
+#   the binary_actions below replace left, right with BinOp()
+#
+# stmt only allows ϵ before 'end' (FOLLOW(stmt) = { end }), the way the hand
+# written parsers have always done it.
+grammar = [
+    ('program', [
+        [TokenType.BEGIN, 'stmt_list', TokenType.END, '@program'],
+    ]),
+    ('stmt_list', [
+        ['assignment', 'stmt_list_prime'],
+        [],
+    ]),
+    ('stmt_list_prime', [
+        [TokenType.SEMICOLON, 'stmt'],
+        [],
+    ]),
+    ('stmt', [
+        ['assignment', 'stmt_list_prime'],
+        [],
+    ]),
+    ('assignment', [
+        [TokenType.ID, '@target', TokenType.ASSIGN, 'expr', '@assign'],
+    ]),
+    ('expr', [
+        ['term', 'expr_prime'],
+    ]),
+    # right recursive, so + and - group to the right (see my_ast.py)
+    ('expr_prime', [
+        [TokenType.PLUS, 'term', 'expr_prime', '@add'],
+        [TokenType.MINUS, 'term', 'expr_prime', '@sub'],
+        [],
+    ]),
+    ('term', [
+        ['factor', 'term_prime'],
+    ]),
+    # the action comes before term', so * div mod group to the left
+    ('term_prime', [
+        [TokenType.MULTIPLY, 'factor', '@mpy', 'term_prime'],
+        [TokenType.DIV, 'factor', '@div', 'term_prime'],
+        [TokenType.MOD, 'factor', '@mod', 'term_prime'],
+        [],
+    ]),
+    ('factor', [
+        ['primary', 'factor_prime'],
+    ]),
+    ('factor_prime', [
+        [TokenType.POWER, 'factor', '@pow'],
+        [],
+    ]),
+    ('primary', [
+        [TokenType.ID, '@var'],
+        [TokenType.NUM, '@num'],
+        [TokenType.LPAREN, 'expr', TokenType.RPAREN],
+    ]),
+]
+
+start_symbol = 'program'
+
+# actions that combine the top two values into a BinOp
+binary_actions = {
+    'add': Opcode.ADD,
+    'sub': Opcode.SUB,
+    'mpy': Opcode.MPY,
+    'div': Opcode.DIV,
+    'mod': Opcode.MOD,
+    'pow': Opcode.POW,
+}
+
+# how terminals are written in error messages, in the order they are listed
+terminal_names = {
+    TokenType.ID: 'id',
+    TokenType.NUM: 'num',
+    TokenType.LPAREN: '(',
+    TokenType.POWER: '^',
+    TokenType.MULTIPLY: '*',
+    TokenType.DIV: 'div',
+    TokenType.MOD: 'mod',
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.SEMICOLON: ';',
+    TokenType.RPAREN: ')',
+    TokenType.END: 'end',
+    TokenType.BEGIN: 'begin',
+    TokenType.ASSIGN: ':=',
+    TokenType.EOF: 'EOF',
+}
+
+# raised for a grammar the generator cannot build a table for
+class GrammarError(Exception):
+    pass
+
+# returns the FIRST set of every rule (None stands for ϵ)
+def first_sets(grammar):
+    first = {name: set() for name, alternatives in grammar}
+    changed = True
+    while (changed):
+        changed = False
+        for name, alternatives in grammar:
+            for symbols in alternatives:
+                found = first_of(symbols, first)
+                if (not found <= first[name]):
+                    first[name] |= found
+                    changed = True
+    return first
+
+# returns the FIRST set of a sequence of symbols
+def first_of(symbols, first):
+    found = set()
+    for symbol in symbols:
+        if (isinstance(symbol, TokenType)):
+            found.add(symbol)
+            return found
+        if (symbol.startswith('@')):
+            continue
+        if (symbol not in first):
+            raise GrammarError('Unknown rule \'%s\'' % symbol)
+        found |= first[symbol] - {None}
+        if (None not in first[symbol]):
+            return found
+    found.add(None)
+    return found
+
+# returns the FOLLOW set of every rule
+def follow_sets(grammar, first, start):
+    follow = {name: set() for name, alternatives in grammar}
+    follow[start].add(TokenType.EOF)
+    changed = True
+    while (changed):
+        changed = False
+        for name, alternatives in grammar:
+            for symbols in alternatives:
+                for i, symbol in enumerate(symbols):
+                    if (isinstance(symbol, TokenType) or symbol.startswith('@')):
+                        continue
+                    found = first_of(symbols[i + 1:], first)
+                    if (None in found):
+                        found = (found - {None}) | follow[name]
+                    if (not found <= follow[symbol]):
+                        follow[symbol] |= found
+                        changed = True
+    return follow
+
+# LL(1) parse table of a grammar. symbols are numbered so the parser stack
+# and the table only hold ints:
+#   terminals     the TokenType value (1 .. num_terminals - 1)
+#   rules         num_terminals + index of the rule
+#   actions       -1 - index of the action
+# table[rule * num_terminals + token] is the alternative to use for a rule
+# when the next token is token, or -1 if the token cannot start the rule.
+class ParseTable():
+    def __init__(self, grammar, start):
+        self.names = [name for name, alternatives in grammar]
+        if (len(set(self.names)) != len(self.names)):
+            raise GrammarError('Rules must have different names')
+        self.first = first_sets(grammar)
+        self.follow = follow_sets(grammar, self.first, start)
+
+        self.num_terminals = max(TokenType) + 1
+        self.actions = []
+        # every alternative, with its symbols numbered and reversed (so the
+        # parser can push them as they are)
+        self.alternatives = []
+        self.epsilon = []
+        self.table = array.array('h', [-1] * (len(self.names) * self.num_terminals))
+
+        for rule, (name, alternatives) in enumerate(grammar):
+            for symbols in alternatives:
+                index = len(self.alternatives)
+                self.alternatives.append(tuple(reversed([self.number(symbol) for symbol in symbols])))
+                self.epsilon.append(len(symbols) == 0)
+                found = first_of(symbols, self.first)
+                if (None in found):
+                    found = (found - {None}) | self.follow[name]
+                for token in found:
+                    cell = rule * self.num_terminals + token
+                    if (self.table[cell] != -1):
+                        raise GrammarError('Grammar is not LL(1): \'%s\' has two alternatives for \'%s\'' % (name, terminal_names[token]))
+                    self.table[cell] = index
+
+    # returns the number of a symbol of the spec
+    def number(self, symbol):
+        if (isinstance(symbol, TokenType)):
+            return int(symbol)
+        if (symbol.startswith('@')):
+            if (symbol[1:] not in self.actions):
+                self.actions.append(symbol[1:])
+            return -1 - self.actions.index(symbol[1:])
+        return self.num_terminals + self.names.index(symbol)
+
+    # returns the number of a rule
+    def rule(self, name):
+        return self.num_terminals + self.names.index(name)
+
+    # returns the terminals a rule can start with (for error messages)
+    def expected(self, rule):
+        row = (rule - self.num_terminals) * self.num_terminals
+        return [token for token in terminal_names if self.table[row + token] != -1]
+
+    # returns the table as text, one line per rule
+    def report(self):
+        tokens = list(terminal_names)
+        lines = ['%-16s %s' % ('', ' '.join('%5s' % terminal_names[token] for token in tokens))]
+        for rule, name in enumerate(self.names):
+            row = rule * self.num_terminals
+            cells = []
+            for token in tokens:
+                if (self.table[row + token] == -1):
+                    cells.append('%5s' % '.')
+                else:
+                    cells.append('%5i' % self.table[row + token])
+            lines.append('%-16s %s' % (name, ' '.join(cells)))
+        return '\n'.join(lines)
+
+# the table of the grammar above
+parse_table = ParseTable(grammar, start_symbol)
+
+if __name__ == '__main__':
+    # prints the FIRST / FOLLOW sets and the parse table
+    names = lambda tokens: ' '.join(terminal_names[token] if token != None else 'ϵ' for token in sorted(tokens, key=lambda token: token or 0))
+    for name in parse_table.names:
+        print ('%-16s FIRST = { %s }' % (name, names(parse_table.first[name])))
+        print ('%-16s FOLLOW = { %s }' % ('', names(parse_table.follow[name])))
+    print ('\n' + parse_table.report())
+    sys.exit()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import bisect
+import itertools
+from my_bytecode import Bytecode
+from my_errors import TextLineIndex
+from my_errors import ParseError
+from my_parser import StackParser
+from my_symbols import SymbolTable
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_incremental.py
+# --------------------------------
+
+# values kept per block by PrefixSums (blocks are split once they hold twice
+# as many)
+block_size = 256
+
+# unused symbols the incremental bytecode may hold beyond twice its number
+# of instructions before they are dropped (see Bytecode.compact())
+compact_slack = 256
+
+# sums of a list of non-negative integers kept as a Fenwick tree, so the sum
+# of the first count values and a single update both take O(log n)
+class FenwickTree():
+    def __init__(self, values=()):
+        self.tree = [0] + list(values)
+        for index in range(1, len(self.tree)):
+            parent = index + (index & -index)
+            if (parent < len(self.tree)):
+                self.tree[parent] += self.tree[index]
+
+    # adds delta to the value at index
+    def add(self, index, delta):
+        index += 1
+        while (index < len(self.tree)):
+            self.tree[index] += delta
+            index += index & -index
+
+    # returns the sum of the first count values
+    def prefix(self, count):
+        total = 0
+        while (count > 0):
+            total += self.tree[count]
+            count &= count - 1
+        return total
+
+    # returns the largest count whose prefix() is at most target
+    def search(self, target):
+        count = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while (step > 0):
+            if (count + step < len(self.tree) and self.tree[count + step] <= target):
+                count += step
+                target -= self.tree[count]
+            step >>= 1
+        return count
+
+# a list of non-negative integers that values can be replaced / inserted /
+# removed in anywhere, with the sum of any prefix. the values are kept in
+# blocks of about block_size whose sums and sizes are Fenwick trees, so
+# every operation takes O(log n + block_size) plus the number of values
+# replaced
+class PrefixSums():
+    def __init__(self, values=()):
+        values = list(values)
+        self.rebuild([values[start:start + block_size] for start in range(0, len(values), block_size)])
+
+    def __len__(self):
+        return self.count
+
+    # replaces the blocks (there is always at least one, maybe empty)
+    def rebuild(self, blocks):
+        if (len(blocks) == 0):
+            blocks = [[]]
+        self.blocks = blocks
+        self.sums = FenwickTree(sum(block) for block in blocks)
+        self.sizes = FenwickTree(len(block) for block in blocks)
+        self.total = self.sums.prefix(len(blocks))
+        self.count = self.sizes.prefix(len(blocks))
+
+    # returns the block holding the value at index (or ending at index)
+    # and the index of its first value
+    def find_block(self, index):
+        block = min(self.sizes.search(index), len(self.blocks) - 1)
+        return block, self.sizes.prefix(block)
+
+    # returns the sum of the first count values
+    def prefix(self, count):
+        block, first = self.find_block(count)
+        return self.sums.prefix(block) + sum(self.blocks[block][:count - first])
+
+    # returns how many values start (their prefix() is) at most target
+    def count_starts(self, target):
+        block = min(self.sums.search(target), len(self.blocks) - 1)
+        starts = itertools.accumulate(self.blocks[block], initial=self.sums.prefix(block))
+        return self.sizes.prefix(block) + bisect.bisect_right(list(starts), target, 0, len(self.blocks[block]))
+
+    # replaces values start:end with the given values
+    def replace(self, start, end, values):
+        first, first_start = self.find_block(start)
+        last, last_start = self.find_block(end)
+        merged = self.blocks[first][:start - first_start] + list(values) + self.blocks[last][end - last_start:]
+
+        # the merged values go back into as many blocks as they came from,
+        # unless those would be far too large or small
+        count = last + 1 - first
+        if (len(merged) > 2 * block_size * count or len(merged) < block_size * count // 4):
+            count = max(1, -(-len(merged) // block_size))
+        size = max(1, -(-len(merged) // count))
+        pieces = [merged[index * size:(index + 1) * size] for index in range(count)]
+
+        if (count != last + 1 - first):
+            self.blocks[first:last + 1] = pieces
+            self.rebuild(self.blocks)
+            return
+        for index, piece in enumerate(pieces):
+            old = self.blocks[first + index]
+            self.sums.add(first + index, sum(piece) - sum(old))
+            self.sizes.add(first + index, len(piece) - len(old))
+            self.total += sum(piece) - sum(old)
+            self.count += len(piece) - len(old)
+            self.blocks[first + index] = piece
+
+# keeps the result of the last parse split into statements so an edit only
+# re-lexes and re-parses the statements it touches.
+#
+# the text is split the same way as PredictiveParser.parse_stream(): every
+# statement ends at a ';' and the last statement runs to the end of the
+# text, so a program with n ';' has n + 1 statements. 'begin' belongs to
+# the first statement and 'end' to the statement it follows.
+#
+# the instructions of every statement are kept in one bytecode that edits
+# splice into. the text length and instruction count of each statement are
+# kept in PrefixSums, so the text / instruction offset of any statement is
+# found in O(log n) and an edit does not walk the statements before it.
+class IncrementalParser():
+    def __init__(self, text=''):
+        self.parser = StackParser(False, False)
+        self.parse(text)
+
+    # number of statements
+    def __len__(self):
+        return len(self.texts)
+
+    # parses a whole new text
+    def parse(self, text):
+        # per statement: source text, error and whether the statement ended
+        # the program with 'end'
+        self.texts = []
+        self.errors = []
+        self.finished = []
+        # per statement: length of the text and number of instructions
+        self.lengths = PrefixSums()
+        self.counts = PrefixSums()
+        # number of statements with an error / ending in 'end'
+        self.num_errors = 0
+        self.num_finished = 0
+        self.output = Bytecode()
+        self.replace_statements(0, 0, self.split(text, True))
+        return self.get_output()
+
+    # replaces text[start:end] with new_text and re-parses only the
+    # statements that overlap the edit. returns (index of the first
+    # re-parsed statement, statements removed, statements added)
+    def edit(self, start, end, new_text):
+        if (start < 0 or end < start or end > self.lengths.total):
+            raise ValueError('edit range %i:%i is outside the text (length %i)' % (start, end, self.lengths.total))
+
+        # statements that contain the edit
+        first = self.locate(start)
+        last = self.locate(end)
+        last_start = self.lengths.prefix(last)
+        if (last > first and last_start == end):
+            last -= 1
+            last_start -= len(self.texts[last])
+
+        text = self.texts[first][:start - self.lengths.prefix(first)] + new_text + self.texts[last][end - last_start:]
+        # if the ';' that ended the edited statements was removed they now
+        # run into the next statement
+        while (not text.endswith(';') and last + 1 < len(self.texts)):
+            last += 1
+            text += self.texts[last]
+
+        pieces = self.split(text, last + 1 == len(self.texts))
+        self.replace_statements(first, last + 1, pieces)
+        return first, last + 1 - first, len(pieces)
+
+    # splits text into statements that each end with ';'. the statement
+    # after the last ';' is only kept at the end of the program.
+    def split(self, text, at_end):
+        pieces = [piece + ';' for piece in text.split(';')]
+        pieces[-1] = pieces[-1][:-1]
+        if (not at_end and pieces[-1] == ''):
+            pieces.pop()
+        return pieces
+
+    # parses pieces and splices them in place of statements first:last
+    def replace_statements(self, first, last, pieces):
+        code = Bytecode()
+        lengths = []
+        counts = []
+        errors = []
+        finished = []
+        for index, piece in enumerate(pieces):
+            stmt_code, error, done = self.parse_statement(piece, first + index == 0)
+            if (stmt_code == None):
+                counts.append(0)
+            else:
+                code.splice(len(code), len(code), stmt_code)
+                counts.append(len(stmt_code))
+            lengths.append(len(piece))
+            errors.append(error)
+            finished.append(done)
+
+        self.output.splice(self.counts.prefix(first), self.counts.prefix(last), code)
+        # splice() only adds symbols, so drop the ones edits left unused
+        if (len(self.output.symbols) > 2 * len(self.output) + compact_slack):
+            self.output.compact()
+        self.num_errors += len(errors) - errors.count(None) - len(self.errors[first:last]) + self.errors[first:last].count(None)
+        self.num_finished += finished.count(True) - self.finished[first:last].count(True)
+
+        self.texts[first:last] = pieces
+        self.lengths.replace(first, last, lengths)
+        self.counts.replace(first, last, counts)
+        self.errors[first:last] = errors
+        self.finished[first:last] = finished
+
+    # parses one statement (see PredictiveParser.stream_stmt) with positions
+    # relative to the statement: returns (bytecode, error, finished)
+    def parse_statement(self, text, first):
+        parser = self.parser
+        parser.text = text
+        parser.line_index = None
+        parser.pos = 0
+        parser.output = Bytecode()
+        # positions are relative to the statement, so its symbols are not
+        # kept past it
+        parser.symbols = SymbolTable()
+        try:
+            parser.tokens = parser.lexer.lex(text, None)
+            finished = parser.stream_stmt(first)
+        except ParseError as error:
+            return None, error, False
+        return parser.output, None, finished
+
+    # returns the index of the statement containing text position pos
+    # (the end of the text belongs to the last statement)
+    def locate(self, pos):
+        return self.lengths.count_starts(pos) - 1
+
+    # returns the statements up to (and including) the one ending in 'end'
+    def program_length(self):
+        # usually only the last statement ends in 'end'
+        if (self.num_finished == 0 or (self.num_finished == 1 and self.finished[-1])):
+            return len(self.finished)
+        if (True in self.finished):
+            return self.finished.index(True) + 1
+        return len(self.finished)
+
+    # returns the current source text
+    def get_text(self):
+        return ''.join(self.texts)
+
+    # returns the source text of the statement at index
+    def statement_text(self, index):
+        return self.texts[index]
+
+    # returns the parse errors of the program with positions in the whole
+    # text (the text is only joined and split into lines when there are
+    # errors)
+    def get_errors(self):
+        found = []
+        for index in range(self.program_length()):
+            if (self.errors[index] != None):
+                found.append((index, self.errors[index]))
+        if (len(found) == 0):
+            return []
+
+        line_index = TextLineIndex(self.get_text())
+        errors = []
+        for index, error in found:
+            errors.append(ParseError(error.pos + self.lengths.prefix(index), line_index, error.msg, error.error_type))
+        return errors
+
+    # returns the bytecode of the whole program, or None if it has errors.
+    # the bytecode is shared with this parser and changes with the next edit
+    def get_output(self):
+        length = self.program_length()
+        if (not self.finished[length - 1]):
+            return None
+        if (length == len(self.texts)):
+            if (self.num_errors > 0):
+                return None
+            return self.output
+        if (self.errors[:length].count(None) != length):
+            return None
+
+        # statements after 'end' are ignored
+        output = Bytecode()
+        output.splice(0, 0, self.output)
+        output.truncate(self.counts.prefix(length))
+        return output
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import array
+import enum
+import itertools
+import operator
+import re
+from my_errors import ParseError
+from my_errors import ParseErrorType
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_lexer.py
+# --------------------------------
+
+# character lists:
+whitespace = ' \n\t\r\v\f'
+alpha_chars = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+alphaNums_chars = '01234567890abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+nums_chars = '01234567890'
+valid_chars = '01234567890abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_:;=+-*^()'
+
+class TokenType(enum.IntEnum):
+    ID = 1
+    NUM = 2
+    BEGIN = 3
+    END = 4
+    ASSIGN = 5
+    SEMICOLON = 6
+    PLUS = 7
+    MINUS = 8
+    MULTIPLY = 9
+    DIV = 10
+    MOD = 11
+    POWER = 12
+    LPAREN = 13
+    RPAREN = 14
+    EOF = 15
+
+# words that are keywords rather than ids
+keyword_tokens = {
+    'begin': TokenType.BEGIN,
+    'end': TokenType.END,
+    'div': TokenType.DIV,
+    'mod': TokenType.MOD,
+}
+
+# single character symbols
+symbol_tokens = {
+    ';': TokenType.SEMICOLON,
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '^': TokenType.POWER,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+}
+
+# every fixed spelling the parser can ask to match
+token_types = dict(keyword_tokens, **symbol_tokens)
+token_types[':='] = TokenType.ASSIGN
+
+# compact token stream: parallel arrays of (kind, start offset, length)
+# where start offsets count from 'offset' (the position of text in its file)
+class TokenStream():
+    def __init__(self, text, offset=0):
+        self.text = text
+        self.offset = offset
+        self.kinds = array.array('B')
+        self.starts = array.array('q')
+        self.lengths = array.array('I')
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, start, length):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    # returns the source text of the token at index
+    def word(self, index):
+        start = self.starts[index] - self.offset
+        return self.text[start:start + self.lengths[index]]
+
+# --------------------------------
+#   FAST PATH (text without errors)
+# --------------------------------
+
+# bytes that can appear in a text without errors
+valid_bytes = (valid_chars + whitespace).encode('ascii')
+
+# splits text into whitespace and tokens (the separators are whatever is
+# between tokens, which is whitespace once the text has been validated).
+# div / mod right after a number is a token of its own
+split_pattern = re.compile(
+    '((?<=[%s])(?:div|mod)' % re.escape(nums_chars) +
+    '|[%s][%s]*' % (re.escape(alpha_chars), re.escape(alphaNums_chars)) +
+    '|[%s]+' % re.escape(nums_chars) +
+    '|:=' +
+    '|[%s])' % re.escape(''.join(symbol_tokens)))
+
+# token type of a word by its first character (keywords are looked up after)
+first_char_kinds = {}
+for char in alpha_chars:
+    first_char_kinds[char] = TokenType.ID
+for char in nums_chars:
+    first_char_kinds[char] = TokenType.NUM
+for char in symbol_tokens:
+    first_char_kinds[char] = symbol_tokens[char]
+first_char_kinds[':'] = TokenType.ASSIGN
+
+# returns True if text has no invalid characters and every ':' / '=' is part
+# of a ':=', i.e. lexing it cannot find an error. checks the whole text with
+# a few calls that each run over it once
+def is_valid(text):
+    if (not text.isascii()):
+        return False
+    if (text.encode('ascii').translate(None, valid_bytes) != b''):
+        return False
+    assigns = text.count(':=')
+    return text.count(':') == assigns and text.count('=') == assigns
+
+# --------------------------------
+#   CHECKED PATH
+# --------------------------------
+
+# one token (after any whitespace) per match, found by the regex engine
+# instead of testing characters one at a time. the groups are the token
+# classes; the last one catches any other character, so invalid characters
+# are found in the same scan.
+token_pattern = re.compile(
+    '[%s]*(?:' % re.escape(whitespace) +
+    '([%s][%s]*)' % (re.escape(alpha_chars), re.escape(alphaNums_chars)) +
+    # allow the format: num div num | num mod num
+    '|([%s]+)(div|mod)?' % re.escape(nums_chars) +
+    '|(:=)' +
+    '|([%s])' % re.escape(''.join(symbol_tokens)) +
+    '|([^%s]))' % re.escape(whitespace))
+
+# regex groups of the token classes
+word_group = 1
+num_group = 2
+num_keyword_group = 3
+assign_group = 4
+symbol_group = 5
+other_group = 6
+
+# turns source text into a token stream
+class MyLexer():
+    # errors: a list to add invalid characters to (they are then skipped)
+    # instead of raising ParseError on the first one
+    # max_errors: stop adding to errors once it holds this many
+    def lex(self, text, line_index, offset=0, errors=None, max_errors=None):
+        if (is_valid(text)):
+            return self.lex_valid(text, offset)
+        return self.lex_checked(text, line_index, offset, errors, max_errors)
+
+    # lexes a text that has passed is_valid() without a python loop over
+    # its tokens: one split finds every token, their positions are running
+    # sums of the piece lengths, and their types come from table lookups
+    def lex_valid(self, text, offset=0):
+        tokens = TokenStream(text, offset)
+        pieces = split_pattern.split(text)
+        words = pieces[1::2]
+        starts = list(itertools.accumulate(map(len, pieces), initial=offset))
+        tokens.kinds.fromlist(list(map(keyword_tokens.get, words, map(first_char_kinds.__getitem__, map(operator.itemgetter(0), words)))))
+        tokens.starts.fromlist(starts[1:len(pieces):2])
+        tokens.lengths.fromlist(list(map(len, words)))
+        tokens.add(TokenType.EOF, offset + len(text), 0)
+        return tokens
+
+    # lexes any text, reporting invalid characters and lone ':' / '='
+    def lex_checked(self, text, line_index, offset=0, errors=None, max_errors=None):
+        tokens = TokenStream(text, offset)
+        kinds = []
+        starts = []
+        lengths = []
+
+        for match in token_pattern.finditer(text):
+            group = match.lastindex
+            # id or keyword
+            if (group == word_group):
+                word = match.group(word_group)
+                kinds.append(keyword_tokens.get(word, TokenType.ID))
+                starts.append(offset + match.start(word_group))
+                lengths.append(len(word))
+
+            # number (and the div / mod right after it)
+            elif (group == num_group or group == num_keyword_group):
+                start, end = match.span(num_group)
+                kinds.append(TokenType.NUM)
+                starts.append(offset + start)
+                lengths.append(end - start)
+                if (group == num_keyword_group):
+                    kinds.append(keyword_tokens[match.group(num_keyword_group)])
+                    starts.append(offset + end)
+                    lengths.append(3)
+
+            # assignment
+            elif (group == assign_group):
+                kinds.append(TokenType.ASSIGN)
+                starts.append(offset + match.start(assign_group))
+                lengths.append(2)
+
+            # single character symbol
+            elif (group == symbol_group):
+                kinds.append(symbol_tokens[match.group(symbol_group)])
+                starts.append(offset + match.start(symbol_group))
+                lengths.append(1)
+
+            else:
+                pos = match.start(other_group)
+                char = match.group(other_group)
+                if (char == ':' or char == '='):
+                    error = ParseError(offset + pos, line_index, 'Expected keyword of type \'ASSIGNMENT\' but found \'%s\'' % char, ParseErrorType.EXPECTED_KEYWORD)
+                else:
+                    error = ParseError(offset + pos + 1, line_index, 'Invaild character (%s)' % char, ParseErrorType.INVALID_CHAR)
+                if (errors == None):
+                    raise error
+                if (max_errors == None or len(errors) < max_errors):
+                    errors.append(error)
+
+        kinds.append(TokenType.EOF)
+        starts.append(offset + len(text))
+        lengths.append(0)
+        tokens.kinds.fromlist(kinds)
+        tokens.starts.fromlist(starts)
+        tokens.lengths.fromlist(lengths)
+        return tokens
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# coding=utf-8
+from my_vm import ADD
+from my_vm import DIV
+from my_vm import HALT
+from my_vm import LVALUE
+from my_vm import MOD
+from my_vm import MPY
+from my_vm import POW
+from my_vm import PUSH
+from my_vm import RVALUE
+from my_vm import STO
+from my_vm import SUB
+from my_vm import decode
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_native.py
+# --------------------------------
+
+# Translates stack machine code into the source of a python function and
+# compiles it with compile(), so running a program costs one python
+# expression per assignment instead of one interpreter loop step per
+# instruction. every id becomes a local of the function:
+#
+#   LVALUE B, RVALUE A, PUSH 2, MPY, STO  ->  def run_program(variables):
+#   LVALUE C, RVALUE B, RVALUE A, ADD, STO        v_A = variables['A']
+#   HALT                                          v_B = (v_A * 2)
+#                                                 v_C = (v_B + v_A)
+#                                                 variables['B'] = v_B
+#                                                 variables['C'] = v_C
+#
+# ids read before they are assigned are loaded first, and the variables are
+# only written back at the end. so when the function fails (an undefined id,
+# a division by zero, a negative exponent) the variables are untouched and
+# the program is run again on the stack machine, which stops at the same
+# instruction with the same MachineError (and leaves the same variables) as
+# it always has.
+
+# python operator of every binary opcode (the stack machine uses the same
+# python int operations)
+binary_operators = {
+    ADD: '+',
+    SUB: '-',
+    MPY: '*',
+    DIV: '//',
+    MOD: '%',
+    POW: '**',
+}
+
+# ^ in the generated code: the stack machine raises a MachineError for a
+# negative exponent, so the function stops there too and the program is
+# run again on the stack machine
+def power(left, right):
+    if (right < 0):
+        raise ArithmeticError('Negative exponent')
+    return left ** right
+
+# deepest expression written as one python expression: deeper ones (long ^
+# chains, deep nesting) are split with temporaries so compile() never runs
+# out of stack
+max_depth = 50
+
+# most compiled programs kept by compile_program()
+max_cached = 256
+
+# compiled programs by bytecode contents, least recently used first
+compiled_programs = {}
+
+# returns the python local of a variable (temporaries of the optimizer,
+# e.g. '$1', are not python names)
+def local_name(name):
+    if (name.isidentifier()):
+        return 'v_' + name
+    return 'x_' + name.encode('utf-8').hex()
+
+# returns (python source of run_program(variables), instructions run) for
+# a decoded program (see my_vm.decode()), or (None, 0) if the code is not
+# what the parsers generate (e.g. a stack underflow)
+def translate(program):
+    lines = []
+    # python expression and its nesting depth (None for an LVALUE target)
+    stack = []
+    # ids read before being assigned, and ids assigned (in order)
+    inputs = {}
+    assigned = {}
+    temps = 0
+    length = len(program)
+
+    for index, (opcode, operand) in enumerate(program):
+        if (opcode == RVALUE):
+            if (operand not in assigned):
+                inputs[operand] = True
+            stack.append((local_name(operand), 0))
+        elif (opcode == PUSH):
+            if (operand < 0):
+                stack.append(('(%i)' % operand, 0))
+            else:
+                stack.append(('%i' % operand, 0))
+        elif (opcode == LVALUE):
+            stack.append((operand, None))
+        elif (opcode in binary_operators):
+            if (len(stack) < 2 or stack[-1][1] == None or stack[-2][1] == None):
+                return None, 0
+            right, right_depth = stack.pop()
+            left, left_depth = stack.pop()
+            if (opcode == POW):
+                expr = 'power(%s, %s)' % (left, right)
+            else:
+                expr = '(%s %s %s)' % (left, binary_operators[opcode], right)
+            depth = max(left_depth, right_depth) + 1
+            if (depth > max_depth):
+                temps += 1
+                lines.append('t%i = %s' % (temps, expr))
+                expr, depth = 't%i' % temps, 0
+            stack.append((expr, depth))
+        elif (opcode == STO):
+            if (len(stack) < 2 or stack[-1][1] == None or stack[-2][1] != None):
+                return None, 0
+            value = stack.pop()[0]
+            target = stack.pop()[0]
+            # values still on the stack were computed before this store
+            for i in range(len(stack)):
+                if (stack[i][1] != None and stack[i][1] > 0):
+                    temps += 1
+                    lines.append('t%i = %s' % (temps, stack[i][0]))
+                    stack[i] = ('t%i' % temps, 0)
+                elif (stack[i][0] == local_name(target)):
+                    temps += 1
+                    lines.append('t%i = %s' % (temps, stack[i][0]))
+                    stack[i] = ('t%i' % temps, 0)
+            lines.append('%s = %s' % (local_name(target), value))
+            assigned[target] = True
+        elif (opcode == HALT):
+            length = index + 1
+            break
+        else:
+            return None, 0
+
+    source = ['def run_program(variables):']
+    for name in inputs:
+        source.append('    %s = variables[%r]' % (local_name(name), name))
+    for line in lines:
+        source.append('    ' + line)
+    for name in assigned:
+        source.append('    variables[%r] = %s' % (name, local_name(name)))
+    source.append('    return variables')
+    return '\n'.join(source) + '\n', length
+
+# a program compiled to a python function
+class NativeProgram():
+    def __init__(self, code):
+        self.program = decode(code)
+        self.source, self.length = translate(self.program)
+        self.function = None
+        if (self.source != None):
+            namespace = {'power': power}
+            exec(compile(self.source, '<program>', 'exec'), namespace)
+            self.function = namespace['run_program']
+
+    # runs the program on the variables of a StackMachine and returns them
+    # (code is only used to format a MachineError)
+    def run(self, machine, code=None):
+        if (self.function != None):
+            try:
+                self.function(machine.variables)
+                machine.executed += self.length
+                return machine.variables
+            except Exception:
+                # the stack machine raises the error for the right
+                # instruction (the variables have not been changed yet)
+                pass
+        return machine.execute(self.program, code)
+
+# returns the NativeProgram of some bytecode, compiling it only the first
+# time the same code is seen
+def compile_program(code):
+    key = (code.opcodes.tobytes(), code.operands.tobytes(), tuple(code.symbols))
+    native = compiled_programs.pop(key, None)
+    if (native == None):
+        native = NativeProgram(code)
+        if (len(compiled_programs) >= max_cached):
+            del compiled_programs[next(iter(compiled_programs))]
+    compiled_programs[key] = native
+    return native
+
+# runs bytecode on a StackMachine through its compiled function
+def run_native(machine, code):
+    return compile_program(code).run(machine, code)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# coding=utf-8
+from my_bytecode import Bytecode
+from my_bytecode import Opcode
+from my_bytecode import operand_opcodes
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_optimizer.py
+# --------------------------------
+
+# largest power (in bits) that will be folded at compile time
+max_pow_bits = 1024
+
+# binary operators and how they are computed (matches StackMachine)
+binary_ops = {
+    Opcode.ADD: lambda left, right: left + right,
+    Opcode.SUB: lambda left, right: left - right,
+    Opcode.MPY: lambda left, right: left * right,
+    Opcode.DIV: lambda left, right: left // right,
+    Opcode.MOD: lambda left, right: left % right,
+    Opcode.POW: lambda left, right: left ** right,
+}
+
+# right operands that can be dropped: x + 0, x - 0, x * 1, x ^ 1
+# (not x div 1: a negative power makes x a float that div would floor)
+right_identities = {
+    Opcode.ADD: 0,
+    Opcode.SUB: 0,
+    Opcode.MPY: 1,
+    Opcode.POW: 1,
+}
+
+# left operands that can be dropped: 0 + x, 1 * x
+left_identities = {
+    Opcode.ADD: 0,
+    Opcode.MPY: 1,
+}
+
+# operators whose operands can be swapped (a value computed as b + a is
+# reused for a + b)
+commutative_ops = (Opcode.ADD, Opcode.MPY)
+
+# prefix of temporaries made by common subexpression elimination (ids can
+# not contain '$', so they never clash with a variable of the program)
+temp_prefix = '$'
+
+# instructions a temporary costs: LVALUE, STO and its first RVALUE
+temp_cost = 3
+
+# returns True if op(left, right) can safely be computed at compile time
+def can_fold(opcode, left, right):
+    if (opcode == Opcode.DIV or opcode == Opcode.MOD):
+        return right != 0
+    if (opcode == Opcode.POW):
+        if (right < 0):
+            return False
+        return abs(left) <= 1 or left.bit_length() * right <= max_pow_bits
+    return True
+
+# constant folding and peephole pass over the stack machine code
+# cse: set to False to skip common subexpression elimination
+class Optimizer():
+    def __init__(self, cse=True):
+        self.cse = cse
+        self.before = 0
+        self.after = 0
+        self.folded = 0
+        self.simplified = 0
+        self.removed = 0
+        # common subexpression elimination: subexpressions read from a
+        # variable / temporary instead of computed again, temporaries made,
+        # and instructions saved
+        self.reused = 0
+        self.temps = 0
+        self.eliminated = 0
+
+    # returns an optimized copy of the given bytecode
+    def optimize(self, code):
+        self.before += len(code)
+        instrs = []
+        for index in range(len(code)):
+            opcode = Opcode(code.opcodes[index])
+            if (opcode in operand_opcodes):
+                instrs.append((opcode, code.symbol(index)))
+            else:
+                instrs.append((opcode, None))
+        stmts = self.split_statements(instrs)
+
+        # code that does not look like parser output is left alone
+        if (stmts == None):
+            self.after += len(code)
+            return code
+
+        # simplify each statement then drop redundant statements
+        stmts = [self.fold(stmt) for stmt in stmts]
+        stmts = self.remove_redundant(stmts)
+        if (self.cse):
+            stmts = self.eliminate_common(stmts)
+
+        result = Bytecode()
+        for stmt in stmts:
+            for opcode, symbol in stmt:
+                if (opcode in operand_opcodes):
+                    result.add(opcode, symbol)
+                else:
+                    result.add(opcode)
+        self.after += len(result)
+        return result
+
+    # returns the counters as one line of text
+    def report(self):
+        return 'Optimized from %i to %i instructions (%i folded, %i simplified, %i removed, %i eliminated by reusing %i subexpressions).' % (self.before, self.after, self.folded, self.simplified, self.removed, self.eliminated, self.reused)
+
+    # splits code into statements ending in STO (plus the final HALT)
+    def split_statements(self, instrs):
+        stmts = []
+        start = 0
+        depth = 0
+        for index, (opcode, symbol) in enumerate(instrs):
+            if (opcode in operand_opcodes):
+                depth += 1
+            elif (opcode == Opcode.STO or opcode in binary_ops):
+                depth -= 1
+                if (depth < 1):
+                    return None
+                if (opcode == Opcode.STO):
+                    depth -= 1
+            if (depth == 0):
+                stmts.append(instrs[start:index + 1])
+                start = index + 1
+        if (depth != 0):
+            return None
+        return stmts
+
+    # folds constant subexpressions and identities in one statement
+    def fold(self, stmt):
+        out = []
+        # each entry is (start index in out, constant value or None)
+        stack = []
+        for opcode, symbol in stmt:
+            if (opcode == Opcode.PUSH):
+                stack.append((len(out), int(symbol)))
+                out.append((opcode, symbol))
+            elif (opcode == Opcode.LVALUE or opcode == Opcode.RVALUE):
+                stack.append((len(out), None))
+                out.append((opcode, symbol))
+            elif (opcode in binary_ops):
+                right_start, right = stack.pop()
+                left_start, left = stack.pop()
+
+                # op(num, num) -> num
+                if (left != None and right != None and can_fold(opcode, left, right)):
+                    value = binary_ops[opcode](left, right)
+                    del out[left_start:]
+                    out.append((Opcode.PUSH, str(value)))
+                    stack.append((left_start, value))
+                    self.folded += 1
+
+                # x op identity -> x
+                elif (right != None and right_identities.get(opcode) == right):
+                    del out[right_start:]
+                    stack.append((left_start, left))
+                    self.simplified += 1
+
+                # identity op x -> x
+                elif (left != None and left_identities.get(opcode) == left):
+                    del out[left_start]
+                    stack.append((left_start, right))
+                    self.simplified += 1
+
+                else:
+                    out.append((opcode, symbol))
+                    stack.append((left_start, None))
+            else:
+                out.append((opcode, symbol))
+                stack.clear()
+        return out
+
+    # removes statements that have no effect
+    def remove_redundant(self, stmts):
+        result = []
+        for stmt in stmts:
+            # x := x
+            if (len(stmt) == 3 and stmt[0][0] == Opcode.LVALUE and stmt[1] == (Opcode.RVALUE, stmt[0][1])):
+                self.removed += 1
+                continue
+
+            # x := num followed by another store to x that does not read x
+            if (len(result) > 0 and stmt[0][0] == Opcode.LVALUE):
+                prev = result[-1]
+                if (len(prev) == 3 and prev[0] == stmt[0] and prev[1][0] == Opcode.PUSH and (Opcode.RVALUE, stmt[0][1]) not in stmt):
+                    result.pop()
+                    self.removed += 1
+
+            result.append(stmt)
+        return result
+
+    # --------------------------------
+    #   COMMON SUBEXPRESSIONS
+    # --------------------------------
+
+    # reuses values computed by earlier code instead of computing them
+    # again. every distinct value of the program gets a number (an
+    # expression DAG): a variable read is numbered by how many times the
+    # variable has been stored to, so a STO kills every value that read the
+    # old contents. a repeated value is read from a variable that still
+    # holds it, or from a temporary stored just before the statement that
+    # computes it first. a statement storing the value its target already
+    # holds is dropped.
+    def eliminate_common(self, stmts):
+        dag = ValueDAG()
+        roots = []
+        for stmt in stmts:
+            if (stmt == [(Opcode.HALT, None)]):
+                roots.append(None)
+                continue
+            if (stmt[0][0] != Opcode.LVALUE or stmt[-1][0] != Opcode.STO):
+                return stmts
+            roots.append((stmt[0][1], dag.add_expr(stmt[1:-1])))
+            dag.store(stmt[0][1])
+
+        # the first pass finds the temporaries that are read more than once,
+        # the second only makes those
+        temps = None
+        for i in range(2):
+            result, uses, reused = self.emit_common(dag, roots, temps)
+            temps = set(value for value, count in uses.values() if count > 1)
+
+        self.temps += len(uses)
+        self.reused += reused
+        self.eliminated += sum(len(stmt) for stmt in stmts) - sum(len(stmt) for stmt in result)
+        return result
+
+    # generates the statements of a DAG (see eliminate_common()). temps is
+    # the set of values that may be stored in temporaries (None: any value
+    # that looks worth it). returns (statements, {temporary: [value, reads]},
+    # number of values read from a variable / temporary)
+    def emit_common(self, dag, roots, temps):
+        remaining = dag.count_uses(root[1] for root in roots if root != None)
+        # value held by every variable / temporary, and holders of each value
+        held_by = {}
+        holders = {}
+        uses = {}
+        reused = 0
+        result = []
+
+        for root in roots:
+            if (root == None):
+                result.append([(Opcode.HALT, None)])
+                continue
+            target, value = root
+            if (held_by.get(target) == value):
+                # the target already holds the value
+                dag.drop_uses(value, remaining)
+                continue
+
+            before = []
+            out = [(Opcode.LVALUE, target)]
+            stack = [value]
+            while (len(stack) > 0):
+                item = stack.pop()
+                if (isinstance(item, tuple)):
+                    # a value whose operands have been generated
+                    value, start = item
+                    out.append((dag.nodes[value][0], None))
+                    if (value != root[1] and remaining[value] > 0 and (temps == None or value in temps)
+                            and remaining[value] * (dag.sizes[value] - 1) > temp_cost):
+                        name = '%s%i' % (temp_prefix, len(uses) + 1)
+                        before.append([(Opcode.LVALUE, name)] + out[start:] + [(Opcode.STO, None)])
+                        out[start:] = [(Opcode.RVALUE, name)]
+                        uses[name] = [value, 1]
+                        held_by[name] = value
+                        holders.setdefault(value, []).append(name)
+                    continue
+
+                remaining[item] -= 1
+                node = dag.nodes[item]
+                if (node[0] == Opcode.PUSH or node[0] == Opcode.RVALUE):
+                    out.append(node)
+                elif (len(holders.get(item, [])) > 0):
+                    name = holders[item][0]
+                    out.append((Opcode.RVALUE, name))
+                    if (name in uses):
+                        uses[name][1] += 1
+                    reused += 1
+                    dag.drop_uses(node[1], remaining)
+                    dag.drop_uses(node[2], remaining)
+                else:
+                    stack.append((item, len(out)))
+                    stack.append(node[2])
+                    stack.append(node[1])
+            out.append((Opcode.STO, None))
+            result.extend(before)
+            result.append(out)
+
+            # the store kills what the target held before
+            if (target in held_by):
+                holders[held_by[target]].remove(target)
+            held_by[target] = root[1]
+            holders.setdefault(root[1], []).append(target)
+        return result, uses, reused
+
+# numbered values of a straight-line program (see
+# Optimizer.eliminate_common()). nodes[value] is:
+#   (PUSH, number text) / (RVALUE, id)  for a number / variable read
+#   (opcode, left value, right value)   for a binary operator
+class ValueDAG():
+    def __init__(self):
+        self.nodes = []
+        self.sizes = []
+        self.numbers = {}
+        # stores to every variable so far
+        self.versions = {}
+
+    # returns the number of a value, numbering it if new
+    def value(self, key, node, size):
+        value = self.numbers.get(key)
+        if (value == None):
+            value = len(self.nodes)
+            self.numbers[key] = value
+            self.nodes.append(node)
+            self.sizes.append(size)
+        return value
+
+    # numbers every value of a postfix expression and returns the number of
+    # the whole expression
+    def add_expr(self, instrs):
+        stack = []
+        for opcode, symbol in instrs:
+            if (opcode == Opcode.PUSH):
+                stack.append(self.value(('num', int(symbol)), (opcode, symbol), 1))
+            elif (opcode == Opcode.RVALUE):
+                stack.append(self.value(('var', symbol, self.versions.get(symbol, 0)), (opcode, symbol), 1))
+            else:
+                right = stack.pop()
+                left = stack.pop()
+                if (opcode in commutative_ops and right < left):
+                    key = (opcode, right, left)
+                else:
+                    key = (opcode, left, right)
+                stack.append(self.value(key, (opcode, left, right), self.sizes[left] + self.sizes[right] + 1))
+        return stack[0]
+
+    # a variable was stored to: later reads are new values
+    def store(self, name):
+        self.versions[name] = self.versions.get(name, 0) + 1
+
+    # returns how many times every value is computed by the given roots
+    def count_uses(self, roots):
+        uses = [0] * len(self.nodes)
+        for root in roots:
+            self.add_uses(root, uses, 1)
+        return uses
+
+    # removes the uses of a value and everything under it (a read of a
+    # holder replaced them)
+    def drop_uses(self, value, uses):
+        self.add_uses(value, uses, -1)
+
+    def add_uses(self, value, uses, count):
+        stack = [value]
+        while (len(stack) > 0):
+            value = stack.pop()
+            uses[value] += count
+            node = self.nodes[value]
+            if (node[0] != Opcode.PUSH and node[0] != Opcode.RVALUE):
+                stack.append(node[1])
+                stack.append(node[2])
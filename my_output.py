@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import sys
+from my_bytecode import Bytecode
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_output.py
+# --------------------------------
+
+# size of the write buffer of an output file
+default_buffer_size = 1 << 20
+
+# writes generated code to stdout or to a file through one large buffer:
+#   text    the listing printed by start.py, rendered a chunk of
+#           instructions at a time (see Bytecode.text_chunks())
+#   binary  the bytecode file format (see Bytecode.write()). its header
+#           holds the instruction count, so code is kept until close()
+# code can be written a piece at a time (e.g. the statements yielded by
+# PredictiveParser.parse_stream()), so a text listing is never held in
+# memory as a whole.
+class OutputWriter():
+    def __init__(self, path=None, binary=False, buffer_size=default_buffer_size):
+        self.path = path
+        self.binary = binary
+        self.instructions = 0
+        # code not written yet (binary format only)
+        self.pending = None
+        if (path != None):
+            self.file = open(path, 'wb', buffering=buffer_size)
+        else:
+            # write bytes under sys.stdout when there is a buffer to write to
+            self.file = getattr(sys.stdout, 'buffer', sys.stdout)
+
+    # writes a Bytecode
+    def write(self, code):
+        self.instructions += len(code)
+        if (self.binary):
+            self.keep(code)
+            return
+        if (self.file is not sys.stdout):
+            # anything printed before goes first
+            sys.stdout.flush()
+        for chunk in code.text_chunks():
+            if (self.file is sys.stdout):
+                self.file.write(chunk)
+            else:
+                self.file.write(chunk.encode('utf-8'))
+
+    # writes every Bytecode of an iterable (e.g. a generator)
+    def write_all(self, codes):
+        for code in codes:
+            self.write(code)
+
+    # adds code to the code waiting for close()
+    def keep(self, code):
+        # (copied: parse_stream() reuses its code for every statement)
+        if (self.pending == None):
+            self.pending = Bytecode()
+        self.pending.splice(len(self.pending), len(self.pending), code)
+
+    # writes any code left and closes the file (stdout is only flushed)
+    def close(self):
+        if (self.pending != None):
+            if (self.path == None):
+                sys.stdout.flush()
+            self.pending.write(self.file)
+            self.pending = None
+        if (self.path != None):
+            self.file.close()
+        else:
+            self.file.flush()
@@ -1,8 +1,32 @@
 #!/usr/bin/env python3
 # coding=utf-8
-import sys
 import time
 import enum
+import mmap
+from my_ast import Assign
+from my_ast import BinOp
+from my_ast import Num
+from my_ast import Program
+from my_ast import Var
+from my_bytecode import Bytecode
+from my_bytecode import Opcode
+from my_codegen import generate
+from my_codegen import generate_stmt
+from my_errors import ErrorSet
+from my_errors import LineIndex
+from my_errors import MappedLineIndex
+from my_errors import ParseError
+from my_errors import ParseErrorType
+from my_errors import TextLineIndex
+from my_grammar import binary_actions
+from my_grammar import parse_table
+from my_grammar import terminal_names
+from my_lexer import MyLexer
+from my_lexer import TokenType
+from my_lexer import token_types
+from my_symbols import SymbolTable
+from my_trace import ParserTracer
+from my_trace import PrintSink
 
 # --------------------------------
 #   Marco Ravelo
@@ -15,13 +39,6 @@ import enum
 # - https://www.booleanworld.com/building-recursive-descent-parsers-definitive-guide/#content
 # - https://cyberzhg.github.io/toolbox/left_rec
 
-# character lists:
-whitespace = ' \n\t\r\v\f'
-alpha_chars = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
-alphaNums_chars = '01234567890abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
-nums_chars = '01234567890'
-valid_chars = '01234567890abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_:;=+-*^()'
-
 # Grammar:
 # <program>   -> begin <stmt_list> end 
 # <stmt>      -> <id> := <expr> | ε
@@ -61,44 +78,48 @@ class KeywordType(enum.Enum):
     PARENTHESIS = 4
     STMT_TERMINATOR = 5
 
-class ParseErrorType(enum.Enum):
-    INVALID_CHAR = 1
-    INVALID_ID = 2
-    EXPECTED_KEYWORD = 3
-    EXPECTED_NUM = 4
-
-# accepts text position and formats an error message for the parser
-class ParseError(Exception):
-    def __init__(self, pos, lines, msg, error_type):
-        self.pos = pos
-        self.lines = lines
-        self.msg = msg
-        self.error_type = error_type
-        
-    def __str__(self):
-        sum = 0
-        count = 0
-        while (sum <= self.pos):
-            sum += len(self.lines[count])
-            count += 1
-        sum -= len(self.lines[count - 1])
-        # print ('sum: %i, count: %i, pos: %i' % (sum, count, self.pos))
-        line_num = count
-        pos_num = self.pos - sum + 1
-        spaces = ''
-        for i in range(pos_num - 1):
-            spaces += ' '
-
-        return 'ParseError[%s]: %s at line %s pos %s:\n%s%s^\n' % (self.error_type.name, self.msg, line_num, pos_num, self.lines[line_num - 1], spaces)
-
-# class that stores output string and id
-class OutputNode():
-    def __init__(self, string, id):
-        self.string = string
-        self.id = id
-
-    def __str__(self):
-        return self.string
+# keyword type of every terminal matched by name (for match() errors)
+keyword_types = {
+    TokenType.BEGIN: KeywordType.PRGRM_KEYWORD,
+    TokenType.END: KeywordType.PRGRM_KEYWORD,
+    TokenType.ASSIGN: KeywordType.ASSIGNMENT,
+    TokenType.SEMICOLON: KeywordType.STMT_TERMINATOR,
+    TokenType.LPAREN: KeywordType.PARENTHESIS,
+    TokenType.RPAREN: KeywordType.PARENTHESIS,
+}
+
+# tokens allowed to follow an expression / term
+expr_follow = (TokenType.SEMICOLON, TokenType.RPAREN, TokenType.END)
+term_follow = (TokenType.PLUS, TokenType.MINUS) + expr_follow
+
+# tokens that error recovery skips ahead to
+sync_tokens = (TokenType.SEMICOLON, TokenType.END, TokenType.EOF)
+
+# most errors reported by one parse with error recovery
+max_errors = 100
+
+# the outcome of compiling one program with parse_string() / parse_bytes() /
+# parse_many()
+class ParseResult():
+    def __init__(self, output, errors, seconds):
+        # the bytecode, or None if the program has errors
+        self.output = output
+        self.errors = errors
+        self.seconds = seconds
+        self.instructions = 0
+        if (output != None):
+            self.instructions = len(output)
+
+    def __bool__(self):
+        return self.output != None
+
+    def to_dict(self):
+        return {
+            'ok': self.output != None,
+            'instructions': self.instructions,
+            'seconds': self.seconds,
+            'errors': [str(error) for error in self.errors],
+        }
 
 # the base parser class
 class MyParser:
@@ -106,576 +127,937 @@ class MyParser:
     #   INITIALIZER
     # --------------------------------
 
-    def __init__(self, print_tree, time_parse):
+    # grammar rules reported to a tracer
+    rules = ('program', 'stmt_list', 'stmt', 'expr', 'term', 'factor', 'primary', 'stmt_list_prime', 'expr_prime', 'term_prime')
+
+    # tracer: a ParserTracer to profile / trace the rules with (print_tree
+    # attaches one that prints the parse tree)
+    def __init__(self, print_tree, time_parse, tracer=None):
         self.text = ''
-        self.lines = None
+        self.line_index = None
+        self.tokens = None
+        self.lexer = MyLexer()
         self.pos = -1
-        self.len = -1
-        self.output = []
-        self.output_id = 0
-        self.tabs = 0
+        self.output = Bytecode()
+        # ids and numbers of the last program parsed (see my_symbols.py)
+        self.symbols = SymbolTable()
         self.print_tree = print_tree
         self.time = time_parse
-        self.errors = []
-        
+        self.errors = ErrorSet()
+        # errors of statements skipped by error recovery
+        self.found = []
+        self.tracer = None
+        if (tracer == None and print_tree):
+            tracer = ParserTracer([PrintSink()])
+        if (tracer != None):
+            tracer.attach(self)
 
     # --------------------------------
     #   HELPER FUNCTIONS
     # --------------------------------
 
-    # skips over whitespace
-    def ignore_whitespace(self):
-        # skip any whitespace chars
-        while (self.pos < self.len and self.text[self.pos] in whitespace):
-            self.pos += 1
-        return
+    # returns the word of the next token without consuming it
+    def get_next_word(self):
+        return self.tokens.word(self.pos)
 
-    # gets the next word separated by whitespace
-    def get_next_word(self, any_valid_symbol=False, limit=sys.maxsize):
-        self.ignore_whitespace()
+    # returns the type of the next token without consuming it
+    def get_next_kind(self):
+        return self.tokens.kinds[self.pos]
 
-        non_valid = ';+-*^()'
-        if (any_valid_symbol):
-            non_valid = ''
-
-        # create word until whitespace detected or EOF
-        temp_pos = self.pos
-        count = 0
-        while (count < limit and temp_pos <= self.len and self.text[temp_pos] not in whitespace and self.text[temp_pos] not in non_valid):
-            temp_pos += 1
-            count += 1
-        
-        word_found = self.text[self.pos:temp_pos]
-
-        # check to see if word is in the format: num div num | num mod num
-        if ('div' in word_found and word_found != 'div'):
-            split_list = word_found.split('div')
-            while ("" in split_list):
-                split_list.remove("")
-            print (split_list)
-            is_num = True
-            if (len(split_list) == 1):
-                word_found = 'div'
-            else:
-                for word in split_list:
-                    for char in word:
-                        if (char not in nums_chars):
-                            is_num = False
-                if (is_num and len(split_list) == 2):
-                    word_found = split_list[0]
-            
-        elif ('mod' in word_found and word_found != 'mod'):
-            split_list = word_found.split('mod')
-            while ("" in split_list): 
-                split_list.remove("")
-            print (split_list)
-            is_num = True
-            if (len(split_list) == 1):
-                word_found = 'mod'
-            else:
-                for word in split_list:
-                    for char in word:
-                        if (char not in nums_chars):
-                            is_num = False
-                if (is_num and len(split_list) == 2):
-                    word_found = split_list[0]
-
-        # make sure word is valid
-        index = 0
-        for char in word_found:
-            index += 1
-            if (char not in valid_chars):
-                raise ParseError(self.pos + index, self.lines, 'Invaild character (%s)' % char, ParseErrorType.INVALID_CHAR)
-        
-        self.pretty_print_tabs('word found: %s' % word_found)
-        return word_found
-    
     # attempts to match the given keyword
     def match(self, keyword, keyword_type):
-        word = self.get_next_word(True, len(keyword))
-        if (word == keyword):
-            self.pos += len(keyword)
-            self.pretty_print_tabs('matched: %s' % keyword)
+        if (self.tokens.kinds[self.pos] == token_types[keyword]):
+            self.pos += 1
+            self.trace('matched: %s' % keyword)
             return
 
-        raise ParseError(self.pos, self.lines, 'Expected keyword of type \'%s\' but found \'%s\'' % (keyword_type.name, word), ParseErrorType.EXPECTED_KEYWORD)
+        raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected keyword of type \'%s\' but found \'%s\'' % (keyword_type.name, self.get_next_word()), ParseErrorType.EXPECTED_KEYWORD)
 
     # attempts to find and return an id
     def get_id(self, must_exist):
-        self.ignore_whitespace()
-
-        id_found = self.get_next_word()
-
-        if (len(id_found) == 0):
-            raise ParseError(self.pos, self.lines, 'Invalid id (missing id)', ParseErrorType.INVALID_ID)
-        
-        # ensure chars in id are allowed:
-        # '<id> represents any valid sequence of characters and digits starting with a character'
-        if (id_found[0] not in alpha_chars):
-            raise ParseError(self.pos, self.lines, 'Invalid id (must start with character)', ParseErrorType.INVALID_ID)
-            
-        for i in range(1, len(id_found) - 1):
-            if (id_found[i] not in alphaNums_chars):
-                raise ParseError(self.pos + i, self.lines, 'Invaild id (invaild char -> %s)' % id_found[i], ParseErrorType.INVALID_ID)
-        
-        self.pos += len(id_found)
-        self.pretty_print_tabs("id found: %s" % id_found)
+        kind = self.tokens.kinds[self.pos]
+        if (kind != TokenType.ID):
+            # '<id> represents any valid sequence of characters and digits starting with a character'
+            if (kind == TokenType.NUM):
+                raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Invalid id (must start with character)', ParseErrorType.INVALID_ID)
+            raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Invalid id (missing id)', ParseErrorType.INVALID_ID)
+
+        id_found = self.symbols.intern(self.get_next_word())
+        self.pos += 1
+        self.trace("id found: %s" % id_found)
         return id_found
 
     # attempts to get the next number
     def get_number(self):
-        self.ignore_whitespace()
-
-        num_found = self.get_next_word()
-        if (num_found == ''):
-            raise ParseError(self.pos, self.lines, 'Expected number character (empty number)', ParseErrorType.EXPECTED_NUM)
+        if (self.tokens.kinds[self.pos] != TokenType.NUM):
+            raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected number character (invalid number -> %s)' % self.get_next_word(), ParseErrorType.EXPECTED_NUM)
 
-        for num in num_found:
-            if (num not in nums_chars):
-                raise ParseError(self.pos, self.lines, 'Expected number character (invalid number -> %s)' % num, ParseErrorType.EXPECTED_NUM)
-        
-        self.pos += len(num_found)
-        self.pretty_print_tabs("number found: %s" % num_found)
+        num_found = self.symbols.intern(self.get_next_word())
+        self.pos += 1
+        self.trace("number found: %s" % num_found)
         return num_found
     
-    # used to print out the parse tree
-    def pretty_print(self, name, start=True):
-        # return if print false
-        if (not self.print_tree):
-            return
-
-        if (start):
-            for i in range(self.tabs):
-                print ('- ', end='')
-            print ('%i <%s: start' % (self.tabs, name))
-            self.tabs += 1
-        else:
-            self.tabs -= 1
-            for i in range(self.tabs):
-                print ('x ', end='')
-            print ('%i >%s: end' % (self.tabs, name))
-    
-    # print out words w tabs
-    def pretty_print_tabs(self, word):
-        # return if print false
-        if (not self.print_tree):
-            return
-
-        for i in range(self.tabs):
-            print ('- ', end='')
-        print (' *%s' % word)
-
-    # determine what error to show user
+    # reports something found to the tracer (if any)
+    def trace(self, word):
+        if (self.tracer != None):
+            self.tracer.event(word)
+
+    # records an error that is being passed on to the caller
+    def add_error(self, error):
+        self.errors.add(error)
+
+    # records the error of a failed alternative before trying the next one
+    def backtrack(self, error):
+        self.errors.add(error)
+        if (self.tracer != None):
+            self.tracer.backtrack()
+
+    # determine what error to show user: every error found by error
+    # recovery, then the furthest errors of the alternatives that failed
     def determine_errors(self):
-        index = 0
-        max_index = 0
-        max_pos = 0
-        errors = []
-        for error in self.errors:
-            if (error.pos >= max_pos):
-                max_pos = error.pos
-                max_index = index
-            index += 1
-
-        for error in self.errors:
-            if (error.pos == max_pos):
-                errors.append(error)
-        
-        # remove any duplicate errors
-        res = []
-        used_types = []
-        for error in errors: 
-            if (error.error_type not in used_types):
-                used_types.append(error.error_type)
-                res.append(error)
-
-        return res
-
-    def add_output(self, instruction):
-        id = self.output_id
-        self.output.append(OutputNode(instruction, id))
-        self.output_id += 1
-        return id
-
-    def remove_outputs(self, ids=[]):
-        for id in ids:
-            for node in self.output:
-                if (node.id == id):
-                    self.output.remove(node)
-                    break
-        return
-
-    def get_last_output(self):
-        if (len(self.output) > 0):
-            return self.output[-1]
-
+        return self.found + list(self.errors)
 
     # --------------------------------
     #   PARSING FUNCTIONS
     # --------------------------------
 
-    # starts parsing
-    def parse(self, lines):
+    # starts parsing and generates stack machine code from the tree
+    # set report_errors to False to leave printing the errors (found with
+    # determine_errors()) to the caller
+    # set recover to True to skip to the next ';' / 'end' after an error and
+    # keep parsing, so every error in the text is found in one pass
+    def parse(self, lines, report_errors=True, recover=False):
+        tree = self.parse_ast(lines, report_errors, recover)
+        if (tree == None):
+            return None
+        self.output = generate(tree)
+        self.symbols.count_uses(self.output)
+        return self.output
+
+    # starts parsing and returns the tree of the program (see my_ast.py), or
+    # None if there are errors
+    def parse_ast(self, lines, report_errors=True, recover=False):
         # combine all text into a single string
-        for element in lines:
-            self.text += element
-        self.lines = lines
+        return self.parse_text(''.join(lines), LineIndex(lines), report_errors, recover)
+
+    # parses text (whose lines are found with line_index) and returns the
+    # tree, or None. everything left by the last parse is reset first, so a
+    # parser can be reused for any number of programs. tokens are the tokens
+    # of text if it was lexed already (see my_timing.py); recovering always
+    # lexes again to collect the errors
+    def parse_text(self, text, line_index, report_errors=True, recover=False, tokens=None):
+        self.text = text
+        self.line_index = line_index
+        self.tokens = tokens
         self.pos = 0
-        self.len = len(self.text) - 1
-        self.output = []
-        self.output_id = 0
-        self.tabs = 0
-        self.errors = []
+        self.output = None
+        self.symbols = SymbolTable()
+        self.errors.clear()
+        self.found = []
 
         # time parse
         if (self.time):
             start_time = time.perf_counter()
 
         # being parsing
-        self.pretty_print('parse', True)
+        if (self.tracer != None):
+            self.tracer.enter('parse')
         try:
-            self.program()
+            # split text into tokens once before parsing
+            if (recover):
+                self.tokens = self.lexer.lex(self.text, self.line_index, 0, self.found, max_errors)
+                tree = self.recover_program()
+            else:
+                try:
+                    if (self.tokens == None):
+                        self.tokens = self.lexer.lex(self.text, self.line_index)
+                except ParseError as error1:
+                    self.add_error(error1)
+                    raise error1
+                tree = self.program()
         except ParseError as error:
+            if (self.tracer != None):
+                self.tracer.exit('parse')
             # print error(s) to user
             errors = self.determine_errors()
-            if (len(errors) > 0):
-                count = 0
+            if (report_errors and len(errors) > 0):
                 print ('\nPossible Errors:')
-                for error in errors:
-                    print ('%i %s' % (count, error))
-                    count += 1
+                print ('\n'.join(['%i %s' % (count, error) for count, error in enumerate(errors)]))
             
             return None
-        self.pretty_print('parse', False)
+        if (self.tracer != None):
+            self.tracer.exit('parse')
+
+        if (len(self.found) > 0):
+            self.found.sort(key=lambda error: error.pos)
+            # the errors of the last statement can go past max_errors
+            del self.found[max_errors:]
+            if (report_errors):
+                print ('\nFound %i error(s):' % len(self.found))
+                print ('\n'.join(['%i %s' % (count, error) for count, error in enumerate(self.found)]))
+            return None
 
         # print parse time
         if (self.time):
             total_time = time.perf_counter() - start_time
             print ('Parse time: %f' % round(total_time, 3))
 
-        return self.output
+        return tree
+
+    # --------------------------------
+    #   HIGH-VOLUME FUNCTIONS
+    # --------------------------------
+
+    # compiles a program given as one string and returns a ParseResult.
+    # the text is not split into lines (lines are only looked up to format
+    # an error) and nothing is printed: errors are in the result
+    def parse_string(self, text, recover=False):
+        start_time = time.perf_counter()
+        tree = self.parse_text(text, TextLineIndex(text), False, recover)
+        if (tree == None):
+            return ParseResult(None, self.determine_errors(), time.perf_counter() - start_time)
+        self.output = generate(tree)
+        self.symbols.count_uses(self.output)
+        return ParseResult(self.output, [], time.perf_counter() - start_time)
+
+    # compiles a program given as bytes (e.g. read from a socket or a file
+    # opened in binary mode). the language is ascii, so bytes are decoded
+    # one for one and error positions stay byte offsets
+    def parse_bytes(self, data, recover=False):
+        return self.parse_string(str(data, 'latin-1'), recover)
+
+    # compiles every program (strings or bytes) of an iterable one after the
+    # other with this parser, yielding one ParseResult each
+    def parse_many(self, texts, recover=False):
+        for text in texts:
+            if (isinstance(text, str)):
+                yield self.parse_string(text, recover)
+            else:
+                yield self.parse_bytes(text, recover)
+
+    # --------------------------------
+    #   GRAMMAR RULES
+    # --------------------------------
 
     # program -> begin stmt_list end
     def program(self):
-        self.pretty_print('program', True)
         try:
             self.match('begin', KeywordType.PRGRM_KEYWORD)
-            self.stmt_list()
+            stmts = self.stmt_list()
             self.match('end', KeywordType.PRGRM_KEYWORD)
-            self.add_output('HALT') # add to stack machine output
         except ParseError as error1:
-            self.errors.append(error1)
+            self.add_error(error1)
             raise error1
-        self.pretty_print('program', False)
-        return
+        return Program(stmts)
+
+    # program -> begin stmt_list end, parsed one statement at a time. after
+    # an error the furthest errors of the statement are kept and parsing
+    # picks up again after the next ';' (or at 'end')
+    def recover_program(self):
+        stmts = []
+        try:
+            self.match('begin', KeywordType.PRGRM_KEYWORD)
+        except ParseError as error1:
+            # parse the statements anyway
+            self.found.append(error1)
+
+        while (len(self.found) < max_errors):
+            # alternatives that failed in the last statement are not errors
+            self.errors.clear()
+            try:
+                stmt = self.stmt()
+                kind = self.get_next_kind()
+                if (kind != TokenType.SEMICOLON and kind != TokenType.END):
+                    raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected keyword ( ; | end ) but found \'%s\'' % self.get_next_word(), ParseErrorType.EXPECTED_KEYWORD)
+                if (stmt != None):
+                    stmts.append(stmt)
+                if (kind == TokenType.SEMICOLON):
+                    self.match(';', KeywordType.STMT_TERMINATOR)
+                    continue
+                self.match('end', KeywordType.PRGRM_KEYWORD)
+                break
+
+            except ParseError as error1:
+                self.add_error(error1)
+                self.found.extend(self.errors)
+                self.errors.clear()
+                # skip the rest of the statement
+                while (self.get_next_kind() not in sync_tokens):
+                    self.pos += 1
+                if (self.get_next_kind() == TokenType.EOF):
+                    # the text ended without 'end'
+                    if (error1.pos < self.tokens.starts[self.pos]):
+                        try:
+                            self.match('end', KeywordType.PRGRM_KEYWORD)
+                        except ParseError as error2:
+                            self.found.append(error2)
+                    break
+                if (self.get_next_kind() == TokenType.SEMICOLON):
+                    self.pos += 1
+
+        return Program(stmts)
+
+    # id := expr (the first alternative of stmt_list and stmt)
+    def assignment(self):
+        pos = self.tokens.starts[self.pos]
+        id = self.get_id(False)
+        self.symbols.define(id, pos)
+        self.match(':=', KeywordType.ASSIGNMENT)
+        return Assign(id, self.expr(), pos)
     
     # stmt_list -> id := expr stmt_list'
     #            | stmt_list'
     def stmt_list(self):
-        self.pretty_print('stmt_list', True)
         prev_pos = self.pos
-        output_ids = []
+        stmts = []
         try:
-            id = self.get_id(False)
-            output_ids.append(self.add_output('LVALUE\t%s' % id)) # add to stack machine output
-            self.match(':=', KeywordType.ASSIGNMENT)
-            output_ids.extend(self.expr())
-            output_ids.extend(self.stmt_list_prime())
+            stmts.append(self.assignment())
+            self.stmt_list_prime(stmts)
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.backtrack(error1)
             # try next
             try: 
                 self.pos = prev_pos
-                output_ids.append(self.expr_prime())
+                self.expr_prime(None)
+                stmts = []
 
             except ParseError as error2:
                 # add error to list
-                self.errors.append(error2)
-                # remove outputs and clear array
-                self.remove_outputs(output_ids)
-                output_ids.clear()
+                self.add_error(error2)
                 raise error2
 
-        self.pretty_print('stmt_list', False)
-        return output_ids
+        return stmts
     
     # stmt -> id := expr
     #       | ϵ
     def stmt(self):
-        self.pretty_print('stmt', True)
         prev_pos = self.pos
-        output_ids = []
         try:
-            id = self.get_id(False)
-            output_ids.append(self.add_output('LVALUE\t%s' % id)) # add to stack machine output
-            self.match(':=', KeywordType.ASSIGNMENT)
-            output_ids.extend(self.expr())
+            return self.assignment()
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.backtrack(error1)
             # check to see if stmt = ϵ
             self.pos = prev_pos
-            word = self.get_next_word()
-            if (word != 'end'):
-                raise ParseError(self.pos, self.lines, 'Expected keyword \'end\' but found \'%s\'' % word, ParseErrorType.EXPECTED_KEYWORD)
-            self.pretty_print_tabs('ϵ')
+            if (self.get_next_kind() != TokenType.END):
+                raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected keyword \'end\' but found \'%s\'' % self.get_next_word(), ParseErrorType.EXPECTED_KEYWORD)
+            self.trace('ϵ')
 
-        self.pretty_print('stmt', False)
-        return output_ids
+        return None
     
     # expr -> term expr'
     def expr(self):
-        self.pretty_print('expr', True)
-        output_ids = []
         try:
-            output_ids.extend(self.term())
-            output_ids.extend(self.expr_prime())
+            return self.expr_prime(self.term())
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.add_error(error1)
             raise error1
 
-        self.pretty_print('expr', False)
-        return output_ids
-
     #       term -> factor term'
     def term(self):
-        self.pretty_print('term', True)
-        output_ids = []
         try:
-            output_ids.extend(self.factor())
-            output_ids.extend(self.term_prime())
+            return self.term_prime(self.factor())
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.add_error(error1)
             raise error1
 
-        self.pretty_print('term', False)
-        return output_ids
-
         
     # factor -> primary ^ factor
     #         | primary
     def factor(self):
-        self.pretty_print('factor', True)
         prev_pos = self.pos
-        oi = []
         try:
-            oi.extend(self.primary())
+            left = self.primary()
             self.match('^', KeywordType.OPERATOR)
-            oi.extend(self.factor())
-            oi.append(self.add_output('POW')) # add to stack machine output
+            return BinOp(Opcode.POW, left, self.factor())
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(oi)
-            oi.clear()
+            self.backtrack(error1)
             try:
                 self.pos = prev_pos
-                oi.extend(self.primary())
+                return self.primary()
                 
             except ParseError as error2:
                 # add error to list
-                self.errors.append(error2)
-                # remove outputs and clear array
-                self.remove_outputs(oi)
-                oi.clear()
+                self.add_error(error2)
                 raise error2
 
-        self.pretty_print('factor', False)
-        return oi
-
     # primary -> id
     #          | num
     #          | ( expr )
     def primary(self):
-        self.pretty_print('primary', True)
         prev_pos = self.pos
-        oi = []
         try:
-            id = self.get_id(True)
-            oi.append(self.add_output('RVALUE\t%s' % id)) # add to stack machine output
+            pos = self.tokens.starts[self.pos]
+            return Var(self.get_id(True), pos)
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(oi)
-            oi.clear()
+            self.backtrack(error1)
             try:
                 self.pos = prev_pos
-                num = self.get_number()
-                oi.append(self.add_output('PUSH\t%s' % num)) # add to stack machine output
+                return Num(self.get_number(), pos)
 
             except ParseError as error2:
                 # add error to list
-                self.errors.append(error2)
-                # remove outputs and clear array
-                self.remove_outputs(oi)
-                oi.clear()
+                self.backtrack(error2)
                 try:
                     self.pos = prev_pos
                     self.match('(', KeywordType.PARENTHESIS)
-                    oi.extend(self.expr())
+                    expr = self.expr()
                     self.match(')', KeywordType.PARENTHESIS)
+                    return expr
 
                 except ParseError as error3:
                     # add error to list
-                    self.errors.append(error3)
-                    # remove outputs and clear array
-                    self.remove_outputs(oi)
-                    oi.clear()
+                    self.add_error(error3)
                     raise error3
 
-        self.pretty_print('primary', False)
-        return oi
-
     # stmt_list' -> ; stmt stmt_list'
     #             | ϵ
-    def stmt_list_prime(self):
-        self.pretty_print('stmt_list_prime', True)
+    # (adds the statements found to stmts)
+    def stmt_list_prime(self, stmts):
         prev_pos = self.pos
-        output_ids = []
+        num_stmts = len(stmts)
         try:
             self.match(';', KeywordType.STMT_TERMINATOR)
-            output_ids.append(self.add_output('STO')) # add to stack machine output
-            print ('sto')
-            output_ids.extend(self.stmt())
-            output_ids.extend(self.stmt_list_prime())
+            stmt = self.stmt()
+            if (stmt != None):
+                stmts.append(stmt)
+            self.stmt_list_prime(stmts)
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.backtrack(error1)
+            # drop the statements of the failed alternative
+            del stmts[num_stmts:]
             # check to see if stmt_list' = ϵ
             self.pos = prev_pos
-            word = self.get_next_word()
-            if (word != 'end'):
-                raise ParseError(self.pos, self.lines, 'Expected keyword \'end\' but found \'%s\'' % word, ParseErrorType.EXPECTED_KEYWORD)
-            self.pretty_print_tabs('ϵ')
-            # add last STO if not already added to output
-            if (self.get_last_output().string != 'STO'):
-                output_ids.append(self.add_output('STO')) # add to stack machine output
+            if (self.get_next_kind() != TokenType.END):
+                raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected keyword \'end\' but found \'%s\'' % self.get_next_word(), ParseErrorType.EXPECTED_KEYWORD)
+            self.trace('ϵ')
 
-        self.pretty_print('stmt_list_prime', False)
-        return output_ids
+        return
 
     # expr' -> + term expr'
     #        | - term expr'
     #        | ϵ
-    def expr_prime(self):
-        self.pretty_print('expr_prime', True)
+    # (returns left combined with the rest of the expression)
+    def expr_prime(self, left):
         prev_pos = self.pos
-        output_ids = []
         try:
             self.match('+', KeywordType.OPERATOR)
-            output_ids.extend(self.term())
-            output_ids.extend(self.expr_prime())
-            output_ids.append(self.add_output('ADD')) # add to stack machine output
+            return BinOp(Opcode.ADD, left, self.expr_prime(self.term()))
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.backtrack(error1)
             self.pos = prev_pos
             try:
                 self.pos = prev_pos
                 self.match('-', KeywordType.OPERATOR)
-                output_ids.extend(self.term())
-                output_ids.extend(self.expr_prime())
-                output_ids.append(self.add_output('SUB')) # add to stack machine output
+                return BinOp(Opcode.SUB, left, self.expr_prime(self.term()))
 
             except ParseError as error2:
                 # add error to list
-                self.errors.append(error2)
-                # remove outputs and clear array
-                self.remove_outputs(output_ids)
-                output_ids.clear()
+                self.backtrack(error2)
                 # check to see if expr' = ϵ
                 self.pos = prev_pos
-                word = self.get_next_word()
-                if (word == ';'):
-                    raise ParseError(self.pos, self.lines, 'Expected keyword \';\' but found \'%s\'' % word, ParseErrorType.EXPECTED_KEYWORD)
-                self.pretty_print_tabs('ϵ')
+                if (self.get_next_kind() not in expr_follow):
+                    raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected keyword ( ; | ) | end ) but found \'%s\'' % self.get_next_word(), ParseErrorType.EXPECTED_KEYWORD)
+                self.trace('ϵ')
 
-        self.pretty_print('expr_prime', False)
-        return output_ids
+        return left
 
     # term' -> * factor term'
     #        | div factor term'
     #        | mod factor term'
     #        | ϵ
-    def term_prime(self):
-        self.pretty_print('term_prime', True)
+    # (returns left combined with the rest of the term)
+    def term_prime(self, left):
         prev_pos = self.pos
-        output_ids = []
         try:
             self.match('*', KeywordType.OPERATOR)
-            output_ids.extend(self.factor())
-            output_ids.append(self.add_output('MPY')) # add to stack machine output
-            output_ids.extend(self.term_prime())
+            return self.term_prime(BinOp(Opcode.MPY, left, self.factor()))
 
         except ParseError as error1:
             # add error to list
-            self.errors.append(error1)
-            # remove outputs and clear array
-            self.remove_outputs(output_ids)
-            output_ids.clear()
+            self.backtrack(error1)
             self.pos = prev_pos
             try:
                 self.match('div', KeywordType.OPERATOR)
-                output_ids.extend(self.factor())
-                output_ids.append(self.add_output('DIV')) # add to stack machine output
-                output_ids.extend(self.term_prime())
+                return self.term_prime(BinOp(Opcode.DIV, left, self.factor()))
 
             except ParseError as error2:
                 # add error to list
-                self.errors.append(error2)
-                # remove outputs and clear array
-                self.remove_outputs(output_ids)
-                output_ids.clear()
+                self.backtrack(error2)
                 self.pos = prev_pos
                 try:
                     self.match('mod', KeywordType.OPERATOR)
-                    output_ids.extend(self.factor())
-                    output_ids.append(self.add_output('MOD')) # add to stack machine output
-                    output_ids.extend(self.term_prime())
+                    return self.term_prime(BinOp(Opcode.MOD, left, self.factor()))
                     
                 except ParseError as error3:
                     # add error to list
-                    self.errors.append(error3)
-                    # remove outputs and clear array
-                    self.remove_outputs(output_ids)
-                    output_ids.clear()
+                    self.backtrack(error3)
                     # check to see if term' = ϵ
                     self.pos = prev_pos
-                    next_word = self.get_next_word()
-                    if (next_word not in '+-' and next_word != 'end'):
-                        raise ParseError (self.pos, self.lines, 'Expected keyword ( + | - | end )', ParseErrorType.EXPECTED_KEYWORD)
-                    self.pretty_print_tabs('ϵ')
+                    if (self.get_next_kind() not in term_follow):
+                        raise ParseError (self.tokens.starts[self.pos], self.line_index, 'Expected keyword ( + | - | ; | ) | end )', ParseErrorType.EXPECTED_KEYWORD)
+                    self.trace('ϵ')
+
+        return left
+# parser that picks each alternative from one token of lookahead
+# instead of trying alternatives and backtracking on ParseError
+class PredictiveParser(MyParser):
+    # compiles a file one statement at a time, yielding the bytecode of
+    # each statement as soon as the ';' that ends it has been parsed. the
+    # file is memory-mapped and only one statement is lexed at a time, so
+    # memory stays bounded by the largest statement. raises ParseError on
+    # the first error found.
+    def parse_stream(self, path):
+        with open(path, 'rb') as open_file:
+            if (open_file.seek(0, 2) == 0):
+                data = b''
+            else:
+                data = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.line_index = MappedLineIndex(data)
+        self.errors = ErrorSet()
+        # only counts: positions would grow with the number of statements
+        self.symbols = SymbolTable(False)
+        start = 0
+        try:
+            while (True):
+                # ';' only appears as a statement terminator, so every
+                # statement ends at the next ';' (or at 'end')
+                stop = data.find(b';', start) + 1
+                if (stop == 0):
+                    stop = len(data)
+
+                # the language is ascii, so decode byte for byte to keep
+                # token offsets equal to file offsets
+                self.text = str(data[start:stop], 'latin-1')
+                self.tokens = self.lexer.lex(self.text, self.line_index, start)
+                self.pos = 0
+                self.output = Bytecode()
+
+                finished = self.stream_stmt(start == 0)
+                self.symbols.count_uses(self.output)
+                yield self.output
+                if (finished):
+                    return
+                start = stop
+        except ParseError as error:
+            error.line_index = self.line_index.detach(error.pos)
+            raise error
+        finally:
+            if (isinstance(data, mmap.mmap)):
+                data.close()
+
+    # parses one chunk of a streamed program and generates its code into
+    # self.output:
+    #   [begin] stmt ;
+    #   [begin] stmt end
+    # returns True once 'end' has been parsed
+    def stream_stmt(self, first):
+        if (first):
+            self.match('begin', KeywordType.PRGRM_KEYWORD)
+        stmt = self.stmt()
+
+        kind = self.get_next_kind()
+        if (kind == TokenType.SEMICOLON):
+            self.match(';', KeywordType.STMT_TERMINATOR)
+            generate_stmt(stmt, self.output)
+            return False
+        if (kind == TokenType.END):
+            self.match('end', KeywordType.PRGRM_KEYWORD)
+            if (stmt != None):
+                generate_stmt(stmt, self.output)
+            self.output.add(Opcode.HALT)
+            return True
+        self.unexpected('( ; | end )')
+
+    # raises an error for a token that no alternative can start with
+    def unexpected(self, expected):
+        raise ParseError(self.tokens.starts[self.pos], self.line_index, 'Expected %s but found \'%s\'' % (expected, self.get_next_word()), ParseErrorType.EXPECTED_KEYWORD)
+
+    # program -> begin stmt_list end
+    def program(self):
+        try:
+            self.match('begin', KeywordType.PRGRM_KEYWORD)
+            stmts = self.stmt_list()
+            self.match('end', KeywordType.PRGRM_KEYWORD)
+        except ParseError as error1:
+            self.add_error(error1)
+            raise error1
+        return Program(stmts)
+
+    # stmt_list -> id := expr stmt_list'
+    #            | stmt_list'
+    def stmt_list(self):
+        stmts = []
+        kind = self.get_next_kind()
+        if (kind == TokenType.ID):
+            stmts.append(self.assignment())
+            self.stmt_list_prime(stmts)
+        elif (kind == TokenType.END):
+            self.trace('ϵ')
+        else:
+            self.unexpected('( id | end )')
+        return stmts
+
+    # stmt -> id := expr
+    #       | ϵ
+    def stmt(self):
+        kind = self.get_next_kind()
+        if (kind == TokenType.ID):
+            return self.assignment()
+        elif (kind == TokenType.END):
+            self.trace('ϵ')
+        else:
+            self.unexpected('( id | end )')
+
+    # expr -> term expr'
+    def expr(self):
+        return self.expr_prime(self.term())
+
+    # term -> factor term'
+    def term(self):
+        return self.term_prime(self.factor())
+
+    # factor -> primary ^ factor
+    #         | primary
+    def factor(self):
+        left = self.primary()
+        if (self.get_next_kind() == TokenType.POWER):
+            self.match('^', KeywordType.OPERATOR)
+            return BinOp(Opcode.POW, left, self.factor())
+        return left
+
+    # primary -> id
+    #          | num
+    #          | ( expr )
+    def primary(self):
+        kind = self.get_next_kind()
+        pos = self.tokens.starts[self.pos]
+        if (kind == TokenType.ID):
+            return Var(self.get_id(True), pos)
+        elif (kind == TokenType.NUM):
+            return Num(self.get_number(), pos)
+        elif (kind == TokenType.LPAREN):
+            self.match('(', KeywordType.PARENTHESIS)
+            expr = self.expr()
+            self.match(')', KeywordType.PARENTHESIS)
+            return expr
+        else:
+            self.unexpected('( id | num | ( )')
+
+    # stmt_list' -> ; stmt stmt_list'
+    #             | ϵ
+    # (adds the statements found to stmts)
+    def stmt_list_prime(self, stmts):
+        kind = self.get_next_kind()
+        if (kind == TokenType.SEMICOLON):
+            self.match(';', KeywordType.STMT_TERMINATOR)
+            stmt = self.stmt()
+            if (stmt != None):
+                stmts.append(stmt)
+            self.stmt_list_prime(stmts)
+        elif (kind == TokenType.END):
+            self.trace('ϵ')
+        else:
+            self.unexpected('( ; | end )')
+
+    # expr' -> + term expr'
+    #        | - term expr'
+    #        | ϵ
+    # (returns left combined with the rest of the expression)
+    def expr_prime(self, left):
+        kind = self.get_next_kind()
+        if (kind == TokenType.PLUS):
+            self.match('+', KeywordType.OPERATOR)
+            return BinOp(Opcode.ADD, left, self.expr_prime(self.term()))
+        elif (kind == TokenType.MINUS):
+            self.match('-', KeywordType.OPERATOR)
+            return BinOp(Opcode.SUB, left, self.expr_prime(self.term()))
+        elif (kind in expr_follow):
+            self.trace('ϵ')
+        else:
+            self.unexpected('( + | - | ; | ) | end )')
+        return left
+
+    # term' -> * factor term'
+    #        | div factor term'
+    #        | mod factor term'
+    #        | ϵ
+    # (returns left combined with the rest of the term)
+    def term_prime(self, left):
+        kind = self.get_next_kind()
+        if (kind == TokenType.MULTIPLY):
+            self.match('*', KeywordType.OPERATOR)
+            return self.term_prime(BinOp(Opcode.MPY, left, self.factor()))
+        elif (kind == TokenType.DIV):
+            self.match('div', KeywordType.OPERATOR)
+            return self.term_prime(BinOp(Opcode.DIV, left, self.factor()))
+        elif (kind == TokenType.MOD):
+            self.match('mod', KeywordType.OPERATOR)
+            return self.term_prime(BinOp(Opcode.MOD, left, self.factor()))
+        elif (kind in term_follow):
+            self.trace('ϵ')
+        else:
+            self.unexpected('( * | div | mod | + | - | ; | ) | end )')
+        return left
+
+# operator precedence (higher binds tighter) and whether an operator groups
+# to the right. + and - group to the right because expr' is right recursive:
+# a - b + c is compiled as a - (b + c)
+binary_ops = {
+    TokenType.PLUS: (1, True, Opcode.ADD),
+    TokenType.MINUS: (1, True, Opcode.SUB),
+    TokenType.MULTIPLY: (2, False, Opcode.MPY),
+    TokenType.DIV: (2, False, Opcode.DIV),
+    TokenType.MOD: (2, False, Opcode.MOD),
+    TokenType.POWER: (3, True, Opcode.POW),
+}
+
+# predictive parser that loops over statement lists and parses expressions
+# with an explicit operator stack (shunting-yard) instead of recursing once
+# per statement, operator and '(', so program length, ^ chains and nesting
+# depth are only limited by memory. it builds the same tree and reports the
+# same errors as PredictiveParser.
+class StackParser(PredictiveParser):
+    # stmt_list -> stmt ( ; stmt )*
+    def stmt_list(self):
+        stmts = []
+        kind = self.get_next_kind()
+        if (kind == TokenType.ID):
+            stmts.append(self.assignment())
+        elif (kind == TokenType.END):
+            self.trace('ϵ')
+        else:
+            self.unexpected('( id | end )')
+
+        while (self.get_next_kind() == TokenType.SEMICOLON):
+            self.match(';', KeywordType.STMT_TERMINATOR)
+            stmt = self.stmt()
+            if (stmt != None):
+                stmts.append(stmt)
+        if (self.get_next_kind() != TokenType.END):
+            self.unexpected('( ; | end )')
+        return stmts
+
+    # expr -> operand ( op operand )*
+    # operand -> id | num | ( expr )
+    def expr(self):
+        operands = []
+        # operators waiting for their right operand, and open '(' (None)
+        operators = []
+        depth = 0
+
+        while (True):
+            # an operand, after any number of '('
+            kind = self.get_next_kind()
+            while (kind == TokenType.LPAREN):
+                self.match('(', KeywordType.PARENTHESIS)
+                operators.append(None)
+                depth += 1
+                kind = self.get_next_kind()
+            pos = self.tokens.starts[self.pos]
+            if (kind == TokenType.ID):
+                operands.append(Var(self.get_id(True), pos))
+            elif (kind == TokenType.NUM):
+                operands.append(Num(self.get_number(), pos))
+            else:
+                self.unexpected('( id | num | ( )')
+
+            # any number of ')', then an operator or the end of the expression
+            kind = self.get_next_kind()
+            while (kind == TokenType.RPAREN and depth > 0):
+                self.match(')', KeywordType.PARENTHESIS)
+                while (operators[-1] != None):
+                    self.reduce(operands, operators)
+                operators.pop()
+                depth -= 1
+                kind = self.get_next_kind()
+
+            if (kind in binary_ops):
+                prec, right_assoc, opcode = binary_ops[kind]
+                while (len(operators) > 0 and operators[-1] != None):
+                    top_prec = binary_ops[operators[-1]][0]
+                    if (top_prec < prec or (top_prec == prec and right_assoc)):
+                        break
+                    self.reduce(operands, operators)
+                self.match(self.get_next_word(), KeywordType.OPERATOR)
+                operators.append(kind)
+            elif (kind in expr_follow):
+                if (depth > 0):
+                    self.match(')', KeywordType.PARENTHESIS)
+                break
+            else:
+                self.unexpected('( * | div | mod | + | - | ; | ) | end )')
+
+        while (len(operators) > 0):
+            self.reduce(operands, operators)
+        return operands[0]
+
+    # replaces the top two operands with the top operator applied to them
+    def reduce(self, operands, operators):
+        right = operands.pop()
+        operands[-1] = BinOp(binary_ops[operators.pop()][2], operands[-1], right)
+
+# predictive parser driven by the LL(1) table generated from the grammar in
+# my_grammar.py instead of one method per rule: rules, terminals and actions
+# are popped off an explicit stack, and the alternative of a rule is found
+# with one table lookup on the next token. it builds the same tree as
+# PredictiveParser and fails at the same token; the expected tokens in its
+# messages are read off the table.
+class TableParser(PredictiveParser):
+    # the table walks the rules itself (see run())
+    rules = ()
+
+    def __init__(self, print_tree, time_parse, tracer=None):
+        super().__init__(print_tree, time_parse, tracer)
+        self.table = parse_table
+        # the methods of the actions, by action number
+        self.actions = []
+        for name in parse_table.actions:
+            if (name in binary_actions):
+                self.actions.append(self.binary_action(binary_actions[name]))
+            else:
+                self.actions.append(getattr(self, 'action_' + name))
+
+    # program -> begin stmt_list end
+    def program(self):
+        try:
+            return self.run('program')[0]
+        except ParseError as error1:
+            self.add_error(error1)
+            raise error1
+
+    # stmt -> id := expr
+    #       | ϵ
+    # (one statement, for stream_stmt() and recover_program())
+    def stmt(self):
+        kind = self.get_next_kind()
+        if (kind == TokenType.ID):
+            return self.run('assignment')[0]
+        if (kind == TokenType.END):
+            self.trace('ϵ')
+            return None
+        self.unexpected_rule(self.table.rule('stmt'))
+
+    # parses one rule from the next token on and returns the values its
+    # actions left on the value stack
+    def run(self, name):
+        table = self.table.table
+        alternatives = self.table.alternatives
+        num_terminals = self.table.num_terminals
+        num_symbols = num_terminals + len(self.table.names)
+        actions = self.actions
+        kinds = self.tokens.kinds
+        tracer = self.tracer
+        stack = [self.table.rule(name)]
+        values = []
+        pos = self.pos
+
+        try:
+            while (len(stack) > 0):
+                symbol = stack.pop()
+                if (symbol < 0):
+                    # an action, given the index of the last token matched
+                    actions[-1 - symbol](values, pos - 1)
+                elif (symbol < num_terminals):
+                    if (kinds[pos] != symbol):
+                        self.pos = pos
+                        self.expected_terminal(symbol)
+                    pos += 1
+                    if (tracer != None):
+                        self.trace_token(pos - 1)
+                elif (symbol < num_symbols):
+                    index = table[(symbol - num_terminals) * num_terminals + kinds[pos]]
+                    if (index < 0):
+                        self.pos = pos
+                        self.unexpected_rule(symbol)
+                    if (tracer != None):
+                        # exits the rule once its symbols are done
+                        stack.append(symbol + len(self.table.names))
+                        tracer.enter(self.table.names[symbol - num_terminals], tracer.rule_stats(self.table.names[symbol - num_terminals]))
+                        if (self.table.epsilon[index]):
+                            self.trace('ϵ')
+                    stack.extend(alternatives[index])
+                else:
+                    tracer.exit(self.table.names[symbol - num_symbols])
+        except ParseError:
+            # close the rules the error was raised in
+            if (tracer != None):
+                for symbol in reversed(stack):
+                    if (symbol >= num_symbols):
+                        tracer.rule_stats(self.table.names[symbol - num_symbols]).raised += 1
+                        tracer.exit(self.table.names[symbol - num_symbols])
+            raise
+
+        self.pos = pos
+        return values
+
+    # raises the error of the next token not being the given terminal
+    def expected_terminal(self, terminal):
+        if (terminal == TokenType.ID):
+            self.get_id(True)
+        if (terminal == TokenType.NUM):
+            self.get_number()
+        self.match(terminal_names[terminal], keyword_types.get(terminal, KeywordType.OPERATOR))
+
+    # raises the error of the next token not starting the given rule
+    def unexpected_rule(self, rule):
+        expected = self.table.expected(rule)
+        if (len(expected) == 1):
+            self.expected_terminal(expected[0])
+        self.unexpected('( %s )' % ' | '.join(terminal_names[token] for token in expected))
+
+    # reports a matched token to the tracer
+    def trace_token(self, index):
+        kind = self.tokens.kinds[index]
+        if (kind == TokenType.ID):
+            self.trace('id found: %s' % self.tokens.word(index))
+        elif (kind == TokenType.NUM):
+            self.trace('number found: %s' % self.tokens.word(index))
+        else:
+            self.trace('matched: %s' % self.tokens.word(index))
+
+    # --------------------------------
+    #   ACTIONS (see my_grammar.py)
+    # --------------------------------
+
+    def action_program(self, values, index):
+        values[:] = [Program(values[:])]
+
+    # (the target is interned here so symbols get ids in text order)
+    def action_target(self, values, index):
+        self.symbols.define(self.symbols.intern(self.tokens.word(index)), self.tokens.starts[index])
+        values.append(index)
+
+    def action_assign(self, values, index):
+        expr = values.pop()
+        target = values.pop()
+        values.append(Assign(self.symbols.intern(self.tokens.word(target)), expr, self.tokens.starts[target]))
+
+    def action_var(self, values, index):
+        values.append(Var(self.symbols.intern(self.tokens.word(index)), self.tokens.starts[index]))
+
+    def action_num(self, values, index):
+        values.append(Num(self.symbols.intern(self.tokens.word(index)), self.tokens.starts[index]))
 
-        self.pretty_print('term_prime', False)
-        return output_ids
\ No newline at end of file
+    # returns the action that replaces the top two values with a BinOp
+    def binary_action(self, opcode):
+        def action_binary(values, index):
+            right = values.pop()
+            values[-1] = BinOp(opcode, values[-1], right)
+        return action_binary
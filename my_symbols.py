@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import array
+import collections
+import itertools
+import json
+from my_bytecode import Opcode
+from my_lexer import alpha_chars
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_symbols.py
+# --------------------------------
+
+# bytes.translate() table giving 1 for the opcodes whose operand is a use
+# of a symbol (RVALUE / PUSH) and 0 for every other opcode
+use_mask = bytes(1 if (opcode in (Opcode.RVALUE, Opcode.PUSH)) else 0 for opcode in range(256))
+
+# the ids and numbers of a program, each kept once. a symbol gets a small
+# integer id (in order of first appearance) and every reference to it in
+# the tree is the table's own string, so a program holds one string per
+# distinct symbol instead of a new slice of the text per reference (and
+# equal symbols compare by identity in the code's symbol table).
+#
+# the table also knows how often each symbol is used as a value (RVALUE /
+# PUSH), how often each id is assigned and the text positions of those
+# assignments (its LVALUE targets). uses are counted from the generated
+# code, because the backtracking parser reads some tokens more than once.
+#
+# keep_sites: set to False to only count assignments. parse_stream() does,
+# so its memory does not grow with the number of statements
+class SymbolTable():
+    def __init__(self, keep_sites=True):
+        self.keep_sites = keep_sites
+        self.names = []
+        self.ids = {}
+        self.uses = []
+        self.assignments = []
+        # text positions of the assignments of each symbol (an array, or
+        # None if never assigned or keep_sites is False)
+        self.definitions = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    # returns the id of a word, adding it if new
+    def add(self, word):
+        index = self.ids.get(word)
+        if (index == None):
+            index = len(self.names)
+            self.names.append(word)
+            self.ids[word] = index
+            self.uses.append(0)
+            self.assignments.append(0)
+            self.definitions.append(None)
+        return index
+
+    # returns the table's copy of a word (adding it if new)
+    def intern(self, word):
+        return self.names[self.add(word)]
+
+    # returns the id of a name, or None
+    def lookup(self, name):
+        return self.ids.get(name)
+
+    # returns the name of an id
+    def name(self, index):
+        return self.names[index]
+
+    # returns True for an id, False for a number
+    def is_id(self, name):
+        return name[0] in alpha_chars
+
+    # records an assignment to name at the given text position
+    def define(self, name, pos):
+        index = self.add(name)
+        self.assignments[index] += 1
+        if (not self.keep_sites):
+            return
+        if (self.definitions[index] == None):
+            self.definitions[index] = array.array('q')
+        self.definitions[index].append(pos)
+
+    # adds the uses of every RVALUE / PUSH of the code (without a python
+    # loop over its instructions)
+    def count_uses(self, code):
+        mask = code.opcodes.tobytes().translate(use_mask)
+        counts = collections.Counter(itertools.compress(code.operands, mask))
+        for operand, count in counts.items():
+            self.uses[self.add(code.symbols[operand])] += count
+
+    # --------------------------------
+    #   QUERIES
+    # --------------------------------
+
+    # returns how often name is used as a value (0 if it never appears)
+    def use_count(self, name):
+        index = self.ids.get(name)
+        if (index == None):
+            return 0
+        return self.uses[index]
+
+    # returns how often name is assigned (0 if it never is)
+    def assignment_count(self, name):
+        index = self.ids.get(name)
+        if (index == None):
+            return 0
+        return self.assignments[index]
+
+    # returns the text positions of the assignments to name (none are kept
+    # with keep_sites=False)
+    def definition_sites(self, name):
+        index = self.ids.get(name)
+        if (index == None or self.definitions[index] == None):
+            return []
+        return list(self.definitions[index])
+
+    # returns the ids that are used but never assigned (their values come
+    # from the variables the stack machine starts with)
+    def undefined(self):
+        return [name for index, name in enumerate(self.names) if (self.is_id(name) and self.uses[index] > 0 and self.assignments[index] == 0)]
+
+    # returns the ids that are assigned but never used
+    def unused(self):
+        return [name for index, name in enumerate(self.names) if (self.uses[index] == 0 and self.assignments[index] > 0)]
+
+    # --------------------------------
+    #   SYMBOL OUTPUT
+    # --------------------------------
+
+    # returns the definition sites of an id as [line, column] pairs when a
+    # line index is given, otherwise as text positions
+    def sites(self, index, line_index=None):
+        positions = self.definitions[index] or []
+        if (line_index == None):
+            return list(positions)
+        return [list(line_index.locate(pos)) for pos in positions]
+
+    def to_dict(self, line_index=None):
+        symbols = []
+        for index, name in enumerate(self.names):
+            symbols.append({
+                'id': index,
+                'name': name,
+                'kind': 'id' if (self.is_id(name)) else 'num',
+                'uses': self.uses[index],
+                'assignments': self.assignments[index],
+                'definitions': self.sites(index, line_index),
+            })
+        return {'symbols': symbols}
+
+    def to_json(self, line_index=None):
+        return json.dumps(self.to_dict(line_index), indent=2)
+
+    # returns the table as text, one symbol per line in order of id
+    def report(self, line_index=None):
+        lines = ['%6s %-16s %10s %10s  %s' % ('id', 'symbol', 'uses', 'assigned', 'assigned at')]
+        for index, name in enumerate(self.names):
+            sites = self.sites(index, line_index)
+            if (line_index != None):
+                sites = ['%i:%i' % (line, column) for line, column in sites]
+            lines.append('%6i %-16s %10i %10i  %s' % (index, name, self.uses[index], self.assignments[index], ', '.join(str(site) for site in sites)))
+        return '\n'.join(lines)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from my_cache import compiler_version
+from my_codegen import generate
+from my_errors import LineIndex
+from my_errors import ParseError
+from my_optimizer import Optimizer
+from my_output import OutputWriter
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_timing.py
+# --------------------------------
+
+# phases of compiling a file, in order:
+#   read      reading the file and indexing its lines
+#   lex       splitting the text into tokens
+#   parse     building the tree (see my_ast.py)
+#   codegen   generating the stack machine code
+#   optimize  optimizing the code (only with optimize=True)
+#   emit      writing the listing (to os.devnull, so a terminal does not
+#             slow it down). its peak memory includes the write buffer,
+#             which is kept small (emit_buffer_size) so the figure is
+#             mostly the rendered listing
+phases = ('read', 'lex', 'parse', 'codegen', 'optimize', 'emit')
+
+# bump when the layout of the json written by CompileTimer.save_json()
+# changes, so dashboards can tell old results from new ones
+timing_format = 1
+
+# write buffer of the emit phase (OutputWriter uses 1 MiB by default)
+emit_buffer_size = io.DEFAULT_BUFFER_SIZE
+
+# returns the p-th percentile of samples (nearest rank)
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+# times of one phase over every measured run
+class PhaseStats():
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        # most memory traced while the phase ran (see CompileTimer.measure())
+        self.peak_bytes = 0
+
+    def to_dict(self):
+        return {
+            'min_ns': min(self.samples),
+            'median_ns': int(statistics.median(self.samples)),
+            'p95_ns': percentile(self.samples, 95),
+            'peak_bytes': self.peak_bytes,
+        }
+
+# times every phase of compiling a file with a parser, separately and over
+# any number of runs. nothing is printed while measuring (errors are not
+# reported and the listing goes to os.devnull), so only the compiler's own
+# work is timed. the parser should not have a tracer attached.
+class CompileTimer():
+    def __init__(self, parser, optimize=False, binary=False):
+        self.parser = parser
+        self.optimize = optimize
+        self.binary = binary
+        self.phases = [name for name in phases if (name != 'optimize' or optimize)]
+        self.stats = {}
+        for name in self.phases + ['total']:
+            self.stats[name] = PhaseStats(name)
+        self.path = None
+        self.runs = 0
+        self.warmup = 0
+        self.tokens = 0
+        self.instructions = 0
+        self.peak_bytes = 0
+
+    # compiles the file at path once and returns the nanoseconds of every
+    # phase, or None if the program has errors. with memory=True the peak
+    # of traced memory during every phase is added to the stats
+    def compile_once(self, path, memory=False):
+        times = {}
+        last = [time.perf_counter_ns()]
+
+        # ends the phase that started at the end of the last one
+        def done(name):
+            times[name] = time.perf_counter_ns() - last[0]
+            if (memory):
+                peak = tracemalloc.get_traced_memory()[1]
+                self.stats[name].peak_bytes = max(self.stats[name].peak_bytes, peak)
+                self.peak_bytes = max(self.peak_bytes, peak)
+                tracemalloc.reset_peak()
+            last[0] = time.perf_counter_ns()
+
+        with open (path, 'r') as open_file:
+            lines = open_file.readlines()
+        text = ''.join(lines)
+        line_index = LineIndex(lines)
+        done('read')
+
+        try:
+            tokens = self.parser.lexer.lex(text, line_index)
+        except ParseError:
+            return None
+        done('lex')
+
+        tree = self.parser.parse_text(text, line_index, False, False, tokens)
+        if (tree == None):
+            return None
+        done('parse')
+
+        output = generate(tree)
+        self.parser.symbols.count_uses(output)
+        done('codegen')
+
+        if (self.optimize):
+            output = Optimizer().optimize(output)
+            done('optimize')
+
+        writer = OutputWriter(os.devnull, self.binary, emit_buffer_size)
+        writer.write(output)
+        writer.close()
+        done('emit')
+
+        self.tokens = len(tokens)
+        self.instructions = len(output)
+        return times
+
+    # compiles the file at path warmup times without keeping the times,
+    # then repeat times keeping them, then once more while tracing memory
+    # (tracing slows every allocation down, so that run is not timed).
+    # returns False if the program has errors
+    def measure(self, path, repeat=1, warmup=0):
+        if (repeat < 1):
+            raise ValueError('repeat must be at least 1')
+        self.path = path
+        for run in range(warmup):
+            if (self.compile_once(path) == None):
+                return False
+        for run in range(repeat):
+            times = self.compile_once(path)
+            if (times == None):
+                return False
+            for name in times:
+                self.stats[name].samples.append(times[name])
+            self.stats['total'].samples.append(sum(times.values()))
+        self.runs += repeat
+        self.warmup += warmup
+
+        tracing = tracemalloc.is_tracing()
+        if (not tracing):
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.compile_once(path, True)
+        self.stats['total'].peak_bytes = self.peak_bytes
+        if (not tracing):
+            tracemalloc.stop()
+        return True
+
+    # --------------------------------
+    #   TIMING OUTPUT
+    # --------------------------------
+
+    def to_dict(self):
+        return {
+            'format': timing_format,
+            'timestamp': int(time.time()),
+            'compiler_version': compiler_version,
+            'python': '%s %s' % (platform.python_implementation(), platform.python_version()),
+            'file': self.path,
+            'bytes': os.path.getsize(self.path),
+            'parser': type(self.parser).__name__,
+            'optimize': self.optimize,
+            'binary': self.binary,
+            'runs': self.runs,
+            'warmup': self.warmup,
+            'tokens': self.tokens,
+            'instructions': self.instructions,
+            'phases': {name: self.stats[name].to_dict() for name in self.phases},
+            'total': self.stats['total'].to_dict(),
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    # writes the times as json to the given file path
+    def save_json(self, path):
+        with open(path, 'w') as open_file:
+            open_file.write(self.to_json())
+            open_file.write('\n')
+
+    # returns the times as a text table, one phase per line
+    def report(self):
+        lines = ['%-10s %12s %12s %12s %12s' % ('phase', 'min (ms)', 'median (ms)', 'p95 (ms)', 'peak (KiB)')]
+        for name in self.phases + ['total']:
+            stats = self.stats[name].to_dict()
+            lines.append('%-10s %12.3f %12.3f %12.3f %12.1f' % (name, stats['min_ns'] / 1e6, stats['median_ns'] / 1e6, stats['p95_ns'] / 1e6, stats['peak_bytes'] / 1024))
+        return '\n'.join(lines)
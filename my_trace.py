@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import json
+import sys
+import time
+from my_errors import ParseError
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_trace.py
+# --------------------------------
+
+# base class for objects that receive parser trace events
+class TraceSink():
+    # a rule (or 'parse') was entered at the given depth
+    def enter(self, name, depth):
+        pass
+
+    # a rule (or 'parse') was exited at the given depth
+    def exit(self, name, depth):
+        pass
+
+    # something was found inside the current rule (a word, id, ϵ, ...)
+    def event(self, word, depth):
+        pass
+
+# prints the parse tree in the format of the old -print flag
+class PrintSink(TraceSink):
+    def __init__(self, stream=None):
+        self.stream = stream
+        if (stream == None):
+            self.stream = sys.stdout
+
+    def enter(self, name, depth):
+        self.stream.write('%s%i <%s: start\n' % ('- ' * depth, depth, name))
+
+    def exit(self, name, depth):
+        self.stream.write('%s%i >%s: end\n' % ('x ' * depth, depth, name))
+
+    def event(self, word, depth):
+        self.stream.write('%s *%s\n' % ('- ' * depth, word))
+
+# keeps every trace event as a tuple: (kind, name / word, depth)
+class ListSink(TraceSink):
+    def __init__(self):
+        self.events = []
+
+    def enter(self, name, depth):
+        self.events.append(('enter', name, depth))
+
+    def exit(self, name, depth):
+        self.events.append(('exit', name, depth))
+
+    def event(self, word, depth):
+        self.events.append(('event', word, depth))
+
+# counters for one grammar rule
+class RuleStats():
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.backtracks = 0
+        self.raised = 0
+        # time spent in the rule itself / including the rules it called
+        self.self_ns = 0
+        self.total_ns = 0
+        self.active = 0
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'backtracks': self.backtracks,
+            'raised': self.raised,
+            'self_ns': self.self_ns,
+            'total_ns': self.total_ns,
+        }
+
+# instruments a parser: sends enter / exit / event calls to the sinks and
+# keeps per rule counters and timings. rule methods are only wrapped on
+# parsers passed to attach(), so a parser without a tracer runs its rules
+# unchanged.
+class ParserTracer():
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+        self.stats = {}
+        # active rules: [stats, start time, time spent in called rules]
+        self.stack = []
+
+    # wraps the grammar rules of the given parser
+    def attach(self, parser):
+        parser.tracer = self
+        for name in parser.rules:
+            setattr(parser, name, self.wrap(name, getattr(parser, name)))
+
+    # returns a version of a rule method that reports to this tracer
+    def wrap(self, name, method):
+        stats = self.rule_stats(name)
+
+        def traced_rule(*args):
+            self.enter(name, stats)
+            try:
+                return method(*args)
+            except ParseError:
+                stats.raised += 1
+                raise
+            finally:
+                self.exit(name)
+        return traced_rule
+
+    # returns the counters of a rule (created on first use)
+    def rule_stats(self, name):
+        stats = self.stats.get(name)
+        if (stats == None):
+            stats = RuleStats(name)
+            self.stats[name] = stats
+        return stats
+
+    # starts a rule (or the whole parse when stats is None)
+    def enter(self, name, stats=None):
+        depth = len(self.stack)
+        for sink in self.sinks:
+            sink.enter(name, depth)
+        if (stats != None):
+            stats.calls += 1
+            stats.active += 1
+        self.stack.append([stats, time.perf_counter_ns(), 0])
+
+    # ends the rule started by the last enter()
+    def exit(self, name):
+        stats, start, child_ns = self.stack.pop()
+        elapsed = time.perf_counter_ns() - start
+        if (stats != None):
+            stats.self_ns += elapsed - child_ns
+            stats.active -= 1
+            # recursive calls are already inside the outermost call's time
+            if (stats.active == 0):
+                stats.total_ns += elapsed
+        if (len(self.stack) > 0):
+            self.stack[-1][2] += elapsed
+        for sink in self.sinks:
+            sink.exit(name, len(self.stack))
+
+    # reports something found inside the current rule
+    def event(self, word):
+        for sink in self.sinks:
+            sink.event(word, len(self.stack))
+
+    # the current rule gave up on an alternative and is trying the next
+    def backtrack(self):
+        for entry in reversed(self.stack):
+            if (entry[0] != None):
+                entry[0].backtracks += 1
+                return
+
+    # --------------------------------
+    #   PROFILE OUTPUT
+    # --------------------------------
+
+    def to_dict(self):
+        rules = {}
+        for name in self.stats:
+            if (self.stats[name].calls > 0):
+                rules[name] = self.stats[name].to_dict()
+        return {'rules': rules}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    # writes the profile as json to the given file path
+    def save_json(self, path):
+        with open(path, 'w') as open_file:
+            open_file.write(self.to_json())
+            open_file.write('\n')
+
+    # returns the profile as a text table, slowest rules first
+    def report(self):
+        lines = ['%-16s %10s %10s %10s %12s %12s' % ('rule', 'calls', 'backtracks', 'raised', 'self (ms)', 'total (ms)')]
+        for stats in sorted(self.stats.values(), key=lambda stats: stats.self_ns, reverse=True):
+            if (stats.calls > 0):
+                lines.append('%-16s %10i %10i %10i %12.3f %12.3f' % (stats.name, stats.calls, stats.backtracks, stats.raised, stats.self_ns / 1e6, stats.total_ns / 1e6))
+        return '\n'.join(lines)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# coding=utf-8
+from my_bytecode import Opcode
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: my_vm.py
+# --------------------------------
+
+# raised when the stack machine cannot execute an instruction
+class MachineError(Exception):
+    def __init__(self, index, instruction, msg):
+        self.index = index
+        self.instruction = instruction
+        self.msg = msg
+
+    def __str__(self):
+        return 'MachineError: %s at instruction %i (%s)' % (self.msg, self.index, self.instruction)
+
+# opcodes as plain ints so dispatch compares small ints
+LVALUE = int(Opcode.LVALUE)
+RVALUE = int(Opcode.RVALUE)
+PUSH = int(Opcode.PUSH)
+ADD = int(Opcode.ADD)
+SUB = int(Opcode.SUB)
+MPY = int(Opcode.MPY)
+DIV = int(Opcode.DIV)
+MOD = int(Opcode.MOD)
+POW = int(Opcode.POW)
+STO = int(Opcode.STO)
+HALT = int(Opcode.HALT)
+
+# turns bytecode into a list of (opcode, operand) pairs where the operand
+# is already a variable name (LVALUE / RVALUE) or an int (PUSH)
+def decode(code):
+    program = []
+    for index in range(len(code)):
+        opcode = code.opcodes[index]
+        if (opcode == PUSH):
+            program.append((opcode, int(code.symbol(index))))
+        elif (opcode == LVALUE or opcode == RVALUE):
+            program.append((opcode, code.symbol(index)))
+        else:
+            program.append((opcode, None))
+    return program
+
+# executes the hypothetical stack machine code generated by MyParser
+class StackMachine():
+    def __init__(self, env=None):
+        self.variables = {}
+        self.executed = 0
+        if (env != None):
+            self.variables.update(env)
+
+    # sets the value of a variable before (or between) runs
+    def set_variable(self, name, value):
+        self.variables[name] = value
+
+    # returns the value of a variable
+    def get_variable(self, name):
+        return self.variables[name]
+
+    # runs the given bytecode and returns the variable store
+    def run(self, code):
+        return self.execute(decode(code), code)
+
+    # runs an already decoded program (see decode())
+    def execute(self, program, code=None):
+        variables = self.variables
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        index = 0
+
+        try:
+            for opcode, operand in program:
+                if (opcode == RVALUE):
+                    push(variables[operand])
+                elif (opcode == PUSH or opcode == LVALUE):
+                    push(operand)
+                elif (opcode == STO):
+                    value = pop()
+                    variables[pop()] = value
+                elif (opcode == ADD):
+                    right = pop()
+                    stack[-1] += right
+                elif (opcode == SUB):
+                    right = pop()
+                    stack[-1] -= right
+                elif (opcode == MPY):
+                    right = pop()
+                    stack[-1] *= right
+                elif (opcode == DIV):
+                    right = pop()
+                    stack[-1] //= right
+                elif (opcode == MOD):
+                    right = pop()
+                    stack[-1] %= right
+                elif (opcode == POW):
+                    right = pop()
+                    # values are ints: 2 ^ -1 would be a float
+                    if (right < 0):
+                        raise MachineError(index, self.describe(program, code, index), 'Negative exponent')
+                    stack[-1] **= right
+                elif (opcode == HALT):
+                    index += 1
+                    break
+                index += 1
+        except KeyError as error:
+            raise MachineError(index, self.describe(program, code, index), 'Undefined variable %s' % error) from None
+        except ZeroDivisionError:
+            raise MachineError(index, self.describe(program, code, index), 'Division by zero') from None
+        except IndexError:
+            raise MachineError(index, self.describe(program, code, index), 'Stack underflow') from None
+        except OverflowError:
+            raise MachineError(index, self.describe(program, code, index), 'Overflow') from None
+        except TypeError:
+            # a variable set to something other than an int
+            raise MachineError(index, self.describe(program, code, index), 'Invalid operand') from None
+        finally:
+            self.executed += index
+
+        return variables
+
+    # formats the instruction at index for error messages
+    def describe(self, program, code, index):
+        if (code != None):
+            return code.render(index)
+        opcode, operand = program[index]
+        if (operand == None):
+            return Opcode(opcode).name
+        return '%s\t%s' % (Opcode(opcode).name, operand)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import asyncio
+import concurrent.futures
+import json
+import os
+import sys
+import time
+from my_parser import MyParser
+from my_parser import StackParser
+from my_optimizer import Optimizer
+from my_timing import percentile
+
+# --------------------------------
+#   Marco Ravelo
+#   CSCE 434 - Compiler Design
+#   Assignment #1 - 2/2/2021 
+#   file: server.py
+# --------------------------------
+
+# Protocol (one JSON object per line in each direction):
+#   request:  {"id": 1, "source": "begin ... end", "backtrack": false,
+#              "optimize": false, "recover": false}
+#   response: {"id": 1, "ok": true, "instructions": ["LVALUE\tA", ...],
+#              "latency_ms": 0.4}
+#         or: {"id": 1, "ok": false, "errors": ["ParseError[...]: ..."],
+#              "latency_ms": 0.4}
+#   request:  {"id": 2, "stats": true} -> {"id": 2, "ok": true, "stats": {...}}
+# a client may send any number of requests without waiting for responses.
+# responses are sent as soon as each program is compiled, so they can come
+# back in a different order: match them up with "id".
+
+# default number of programs being compiled at once
+default_concurrency = 256
+
+# most programs sent to a worker process in one call
+max_batch = 64
+
+# latencies kept for the percentiles in the stats
+max_latencies = 100000
+
+# parsers of this worker process (created once, reused for every request)
+worker_parsers = None
+
+# imports and builds the parsers before the first request arrives
+def warm_worker():
+    global worker_parsers
+    worker_parsers = {
+        False: StackParser(False, False),
+        True: MyParser(False, False),
+    }
+    compile_source('begin A := 1 end')
+
+# compiles one program in a worker process
+# returns (instructions or None, error messages). a program that makes the
+# compiler fail (e.g. RecursionError from deep nesting with the
+# backtracking parser) is answered with an error instead of failing every
+# other program of its batch
+def compile_source(source, backtrack=False, optimize=False, recover=False):
+    try:
+        result = worker_parsers[backtrack].parse_string(source, recover)
+        if (not result):
+            return None, [str(error) for error in result.errors]
+        output = result.output
+        if (optimize):
+            output = Optimizer().optimize(output)
+        return list(output), []
+    except Exception as error:
+        return None, ['Compiler error: %s: %s' % (type(error).__name__, error)]
+
+# compiles a list of (source, backtrack, optimize, recover) in a worker
+def compile_batch(batch):
+    return [compile_source(*args) for args in batch]
+
+# returns the id of a request line, or None if the line has none
+def line_id(line):
+    try:
+        return json.loads(line).get('id')
+    except Exception:
+        return None
+
+# accepts connections and hands programs to a pool of warm worker processes
+class CompileServer():
+    def __init__(self, workers=None, concurrency=default_concurrency):
+        self.workers = workers or os.cpu_count()
+        self.concurrency = concurrency
+        self.executor = None
+        # limits the programs in flight across every connection
+        self.slots = None
+        # programs waiting to be sent to a worker: (args, future)
+        self.pending = []
+        self.requests = 0
+        self.failed = 0
+        self.latencies = []
+        self.start_time = time.perf_counter()
+
+    # starts the worker processes and waits until every one is warm
+    async def start_workers(self):
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, time.sleep, 0) for i in range(self.workers)])
+        self.slots = asyncio.Semaphore(self.concurrency)
+
+    # serves on a unix socket (path) or on localhost tcp (port)
+    async def serve(self, path=None, port=None):
+        await self.start_workers()
+        if (path != None):
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=1 << 24)
+            print ('Listening on %s with %i workers' % (path, self.workers))
+        else:
+            server = await asyncio.start_server(self.handle_connection, '127.0.0.1', port, limit=1 << 24)
+            print ('Listening on 127.0.0.1:%i with %i workers' % (port, self.workers))
+        sys.stdout.flush()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()
+
+    # reads requests from one client until it disconnects
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while (True):
+                line = await reader.readline()
+                if (line == b''):
+                    break
+                # stop reading while too many programs are in flight
+                await self.slots.acquire()
+                task = asyncio.create_task(self.handle_request(line, writer, time.perf_counter()))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if (len(tasks) > 0):
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # compiles one request and writes the response
+    async def handle_request(self, line, writer, start_time):
+        try:
+            response = await self.respond(line)
+            response['latency_ms'] = round((time.perf_counter() - start_time) * 1000, 3)
+            self.record(response)
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception as error:
+            # respond() answers with the request id whenever it can; this
+            # only keeps the client from waiting forever
+            writer.write(json.dumps({'id': line_id(line), 'ok': False, 'errors': ['Server error: %s' % error]}).encode('utf-8') + b'\n')
+        finally:
+            self.slots.release()
+
+    # returns the response to one request line
+    async def respond(self, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            # read the id first so even a bad request is answered with it
+            request_id = request.get('id')
+            if (request.get('stats')):
+                return {'id': request_id, 'ok': True, 'stats': self.stats()}
+            if (not isinstance(request['source'], str)):
+                raise TypeError('source must be a string')
+            args = (request['source'], bool(request.get('backtrack')), bool(request.get('optimize')), bool(request.get('recover')))
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            return {'id': request_id, 'ok': False, 'errors': ['Bad request: %s' % error]}
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # requests that arrive together are sent to the workers together
+        if (len(self.pending) == 0):
+            loop.call_soon(self.dispatch)
+        self.pending.append((args, future))
+        try:
+            instructions, errors = await future
+        except Exception as error:
+            # the whole batch failed (e.g. a worker process died)
+            return {'id': request_id, 'ok': False, 'errors': ['Server error: %s: %s' % (type(error).__name__, error)]}
+        if (instructions == None):
+            return {'id': request_id, 'ok': False, 'errors': errors}
+        return {'id': request_id, 'ok': True, 'instructions': instructions}
+
+    # sends the pending programs to the workers in batches, spread over
+    # every worker
+    def dispatch(self):
+        pending = self.pending
+        self.pending = []
+        size = min(max_batch, max(1, len(pending) // self.workers))
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(pending), size):
+            batch = pending[start:start + size]
+            done = loop.run_in_executor(self.executor, compile_batch, [args for args, future in batch])
+            done.add_done_callback(lambda done, batch=batch: self.finish(batch, done))
+
+    # hands the results of a batch to the requests waiting on them
+    def finish(self, batch, done):
+        if (done.exception() != None):
+            for args, future in batch:
+                future.set_exception(done.exception())
+            return
+        for (args, future), result in zip(batch, done.result()):
+            future.set_result(result)
+
+    # adds a finished request to the metrics
+    def record(self, response):
+        self.requests += 1
+        if (not response['ok']):
+            self.failed += 1
+        if (len(self.latencies) >= max_latencies):
+            self.latencies = self.latencies[max_latencies // 2:]
+        self.latencies.append(response['latency_ms'])
+
+    # returns request counts and latency percentiles (in ms)
+    def stats(self):
+        stats = {
+            'requests': self.requests,
+            'failed': self.failed,
+            'workers': self.workers,
+            'concurrency': self.concurrency,
+            'uptime_s': round(time.perf_counter() - self.start_time, 3),
+        }
+        if (len(self.latencies) > 0):
+            stats['latency_ms'] = {
+                'p50': percentile(self.latencies, 50),
+                'p95': percentile(self.latencies, 95),
+                'p99': percentile(self.latencies, 99),
+                'max': max(self.latencies),
+            }
+        return stats
+
+if __name__ == '__main__':
+    # command line arguments
+    if ('-help' in sys.argv):
+        print ('\tThis program keeps a pool of worker processes ready to\n\
+        compile programs sent over a socket (see client.py), so\n\
+        small programs do not pay for starting python each time.\n\n\
+        usage: server.py [options]\n\n\
+        [Command Argument Commands]\n\
+        -help\t: prints out help for the program\n\
+        -unix PATH\t: listens on a unix socket\n\
+        -port N\t: listens on localhost tcp port N (default: 4340)\n\
+        -j N\t: number of worker processes (default: number of cores)\n\
+        -c N\t: most programs compiled at once (default: %i)\n' % default_concurrency)
+        sys.exit()
+
+    path = None
+    port = 4340
+    workers = None
+    concurrency = default_concurrency
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if (arg == '-unix'):
+            path = next(args)
+        elif (arg == '-port'):
+            port = int(next(args))
+        elif (arg == '-j'):
+            workers = int(next(args))
+        elif (arg == '-c'):
+            concurrency = int(next(args))
+
+    server = CompileServer(workers, concurrency)
+    try:
+        asyncio.run(server.serve(path, port))
+    except KeyboardInterrupt:
+        print (json.dumps(server.stats()))
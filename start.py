@@ -3,7 +3,23 @@
 import os.path
 import sys
 from my_parser import MyParser
+from my_parser import PredictiveParser
+from my_parser import StackParser
+from my_parser import TableParser
 from my_parser import ParseError
+from my_cache import CompileCache
+from my_optimizer import Optimizer
+from my_optimizer import temp_prefix
+from my_trace import ParserTracer
+from my_trace import PrintSink
+from my_timing import CompileTimer
+from my_vm import StackMachine
+from my_native import run_native
+from my_output import OutputWriter
+from my_vm import MachineError
+from my_lexer import alpha_chars
+from my_lexer import alphaNums_chars
+from my_lexer import keyword_tokens
 
 # --------------------------------
 #   Marco Ravelo
@@ -20,6 +36,22 @@ if __name__ == '__main__':
     # command line arguments
     print_tree = False
     time_parse = False
+    repeat = 1
+    warmup = None
+    predictive = False
+    stack = False
+    table = False
+    run_code = False
+    native = False
+    optimize = False
+    stream = False
+    output_path = None
+    binary = False
+    profile = False
+    show_symbols = False
+    recover = False
+    cache = False
+    env = {}
     if ('-help' in sys.argv):
         print ('\tThis program reads text from a text file and parses\n\
         the lines to be translated into hypothetical stack\n\
@@ -28,7 +60,36 @@ if __name__ == '__main__':
         [Command Argument Commands]\n\
         -help\t: prints out help for the program\n\
         -print\t: prints out parse tree\n\
-        -time\t: times how long parsing takes\n\
+        -time\t: times every phase of compiling the file (read, lex,\n\
+        \t  parse, codegen, optimize, emit) and the peak memory, and\n\
+        \t  saves them as json to <input file>.time.json\n\
+        -repeat N\t: times N runs with -time (prints min / median / p95)\n\
+        -warmup N\t: runs N more times first without timing them\n\
+        \t  (default: 1 if -repeat is given, otherwise 0)\n\
+        -profile\t: prints per rule counters / times and saves them\n\
+        \t  as json to <input file>.profile.json\n\
+        -symbols\t: prints every id / number with its uses and the lines\n\
+        \t  it is assigned at (only how often with -stream)\n\
+        -predict\t: parses with one token of lookahead (no backtracking)\n\
+        -stack\t: like -predict but without recursion (for very long\n\
+        \t  programs, ^ chains and deep nesting)\n\
+        -table\t: like -stack but driven by the LL(1) table generated\n\
+        \t  from my_grammar.py\n\
+        -recover\t: keeps parsing after an error to report every error\n\
+        -cache\t: reuses the code of unchanged files from .smcache\n\
+        \t  (nothing is parsed, so -print / -profile / -symbols show\n\
+        \t  nothing)\n\
+        -stream\t: compiles and prints one statement at a time (uses -stack)\n\
+        -O\t: optimizes the generated code (constant folding, peephole,\n\
+        \t  common subexpressions)\n\
+        -run\t: runs the generated code on the stack machine\n\
+        -native\t: like -run but runs the code compiled to a python\n\
+        \t  function (see my_native.py)\n\
+        -o FILE\t: writes the generated output to FILE instead of\n\
+        \t  printing it\n\
+        -binary\t: writes the output in the bytecode file format (see\n\
+        \t  my_bytecode.py, use with -o)\n\
+        NAME=VALUE\t: sets the initial value of a variable for -run\n\
         \n\
         This program was written primarily for Python 3.9.1 64-bit.\n\
         It is not guarenteed to work on any other version.\n')
@@ -37,6 +98,58 @@ if __name__ == '__main__':
         print_tree = True
     if ('-time' in sys.argv):
         time_parse = True
+    if ('-predict' in sys.argv):
+        predictive = True
+    if ('-stack' in sys.argv):
+        stack = True
+    if ('-table' in sys.argv):
+        table = True
+    if ('-profile' in sys.argv):
+        profile = True
+    if ('-symbols' in sys.argv):
+        show_symbols = True
+    if ('-recover' in sys.argv):
+        recover = True
+    if ('-cache' in sys.argv):
+        cache = True
+    if ('-stream' in sys.argv):
+        stream = True
+    if ('-O' in sys.argv):
+        optimize = True
+    if ('-run' in sys.argv):
+        run_code = True
+    if ('-native' in sys.argv):
+        run_code = True
+        native = True
+    if ('-o' in sys.argv):
+        output_path = sys.argv[sys.argv.index('-o') + 1]
+    if ('-binary' in sys.argv):
+        binary = True
+    if ('-repeat' in sys.argv):
+        repeat = int(sys.argv[sys.argv.index('-repeat') + 1])
+        if (repeat < 1):
+            print ('-repeat needs at least 1 run')
+            sys.exit()
+    if ('-warmup' in sys.argv):
+        warmup = int(sys.argv[sys.argv.index('-warmup') + 1])
+    if (warmup == None):
+        warmup = 0
+        if (repeat > 1):
+            warmup = 1
+    # NAME=VALUE sets a variable when NAME is an id (the values of the
+    # options above are never read as one)
+    option_values = [sys.argv.index(option) + 1 for option in ('-o', '-repeat', '-warmup') if (option in sys.argv)]
+    for index, arg in enumerate(sys.argv):
+        if (index == 0 or index in option_values or '=' not in arg):
+            continue
+        name, value = arg.split('=', 1)
+        if (name == '' or name[0] not in alpha_chars or name.strip(alphaNums_chars) != '' or name in keyword_tokens):
+            continue
+        try:
+            env[name] = int(value)
+        except ValueError:
+            print ('%s needs an integer value, not \'%s\'' % (name, value))
+            sys.exit()
 
     while (True):
         # prompt user for input file name
@@ -53,20 +166,133 @@ if __name__ == '__main__':
 
     print ('Found file', input_file)
 
+    # pick the parser (-stream always uses StackParser)
+    if (stream):
+        parser_class = StackParser
+    elif (table):
+        parser_class = TableParser
+    elif (stack):
+        parser_class = StackParser
+    elif (predictive):
+        parser_class = PredictiveParser
+    else:
+        parser_class = MyParser
+
+    # time the phases of compiling the file with a parser of its own (no
+    # tracer, nothing printed) before anything else runs
+    if (time_parse):
+        timer = CompileTimer(parser_class(False, False), optimize, binary)
+        if (timer.measure(input_file, repeat, warmup)):
+            time_file = os.path.splitext(input_file)[0] + '.time.json'
+            print ('\nPhase times (%i runs, %i warmup, saved to %s):' % (repeat, warmup, time_file))
+            print (timer.report())
+            timer.save_json(time_file)
+        else:
+            print ('\nNot timed: the program has errors')
+
+    # compile the file one statement at a time without reading it all
+    if (stream):
+        parser = parser_class(print_tree, False)
+        optimizer = Optimizer()
+        machine = StackMachine(env)
+        if (output_path == None):
+            print ('\nPrinting generated output:')
+        writer = OutputWriter(output_path, binary)
+        try:
+            for output in parser.parse_stream(input_file):
+                if (optimize):
+                    output = optimizer.optimize(output)
+                writer.write(output)
+                if (native):
+                    run_native(machine, output)
+                elif (run_code):
+                    machine.run(output)
+        except ParseError as error:
+            print ('\nPossible Errors:')
+            print ('0 %s' % error)
+            sys.exit()
+        except MachineError as error:
+            print (error)
+            sys.exit()
+        finally:
+            writer.close()
+
+        print ('Finished parsing with no errors.')
+        if (output_path != None):
+            print ('Wrote %i instructions to %s' % (writer.instructions, output_path))
+        if (optimize):
+            print (optimizer.report())
+        if (show_symbols):
+            print ('\nSymbols:')
+            print (parser.symbols.report())
+        if (run_code):
+            print ('\nVariables after running:')
+            for name in machine.variables:
+                if (not name.startswith(temp_prefix)):
+                    print ('%s\t%s' % (name, machine.variables[name]))
+        sys.exit()
+
     # open file and read all lines (removing any '\n' chars)
     with open (input_file, 'r') as open_file:
         lines = open_file.readlines()
 
+    # trace / profile the grammar rules
+    tracer = None
+    if (profile):
+        sinks = []
+        if (print_tree):
+            sinks.append(PrintSink())
+        tracer = ParserTracer(sinks)
+
     # parse the text to generate stack code
-    parser = MyParser(print_tree, time_parse)
-    output = parser.parse(lines)
+    parser = parser_class(print_tree, False, tracer)
+    if (cache):
+        compile_cache = CompileCache()
+        output = compile_cache.compile(lines, parser, optimize, recover=recover)
+        print (compile_cache.report())
+    else:
+        output = parser.parse(lines, recover=recover)
+
+    if (profile):
+        profile_file = os.path.splitext(input_file)[0] + '.profile.json'
+        print ('\nRule profile (saved to %s):' % profile_file)
+        print (tracer.report())
+        tracer.save_json(profile_file)
 
     if (output != None):
         print ('Finished parsing with no errors.')
-        # print output
-        print ('\nPrinting generated output:')
-        for node in output:
-            print (node)
+        if (show_symbols):
+            print ('\nSymbols:')
+            print (parser.symbols.report(parser.line_index))
+
+        # optimize output (the cache stores optimized code)
+        if (optimize and not cache):
+            optimizer = Optimizer()
+            output = optimizer.optimize(output)
+            print (optimizer.report())
+        # print output (or write it to -o FILE)
+        if (output_path == None):
+            print ('\nPrinting generated output:')
+        writer = OutputWriter(output_path, binary)
+        writer.write(output)
+        writer.close()
+        if (output_path != None):
+            print ('Wrote %i instructions to %s' % (writer.instructions, output_path))
+
+        # run output on the stack machine
+        if (run_code):
+            machine = StackMachine(env)
+            try:
+                if (native):
+                    variables = run_native(machine, output)
+                else:
+                    variables = machine.run(output)
+                print ('\nVariables after running:')
+                for name in variables:
+                    if (not name.startswith(temp_prefix)):
+                        print ('%s\t%s' % (name, variables[name]))
+            except MachineError as error:
+                print (error)
 
 
     